@@ -0,0 +1,116 @@
+# 📁 bench_label_parser.py
+# 라벨 파서 성능 비교
+# - 기존 방식 (줄마다 strip / split / map(int) / 튜플 dict) vs 새 방식 (label_parser + TrackStore)
+# - assets/ 의 라벨 파일 4개 + 가장 큰 파일을 100배로 늘린 합성 파일
+# - 결과가 같은지도 함께 확인
+# - 경계 사례(공백 / 부호 / 잘못된 값 / int32 범위)가 기대대로 파싱 또는 잘못된 줄로 보고되는지 확인
+#
+# 실행: python core/bench_label_parser.py  (저장소 최상위 폴더에서)
+
+import os, sys, glob, time, tempfile
+from track_store import load_track_store
+from label_parser import parse_label_bytes
+
+ASSET_DIR = "./assets"
+BLOWUP = 100
+REPEAT = 3
+
+# (줄, 기대 값) — 기대 값이 None 이면 잘못된 줄로 보고되어야 함
+EDGE_CASES = [
+    ("1,2,3,4,5,6,7", (1, 2, 3, 4, 5, 6, 7)),
+    (" 1 , 2,3 ,4,5,6,7\t\r", (1, 2, 3, 4, 5, 6, 7)),
+    ("-1,2,-3,4,5,6,0", (-1, 2, -3, 4, 5, 6, 0)),
+    ("2147483647,-2147483648,0,0,0,0,0", (2147483647, -2147483648, 0, 0, 0, 0, 0)),
+    ("1 2,3,4,5,6,7,8", None),
+    ("1,2,3,4,5,6,7 8", None),
+    ("- 1,2,3,4,5,6,7", None),
+    ("1,2,3,4,5,6", None),
+    ("1,2,3,4,5,6,7,8", None),
+    ("1,,3,4,5,6,7", None),
+    ("1,a,3,4,5,6,7", None),
+    ("1,--2,3,4,5,6,7", None),
+    ("1,2-,3,4,5,6,7", None),
+    ("2147483648,2,3,4,5,6,7", None),
+    ("12345678901,2,3,4,5,6,7", None),
+]
+
+
+def read_raw_data_legacy(path):
+    # 기존 pyQT.py 의 read_raw_data 구현 (비교 기준)
+    frame_data = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            values = list(map(int, line.split(',')))
+            frame, obj_id, x1, y1, x2, y2, label = values
+            if frame not in frame_data:
+                frame_data[frame] = []
+            frame_data[frame].append((obj_id, x1, y1, x2, y2, label))
+    return frame_data
+
+
+def check_edge_cases():
+    # 모든 경계 사례를 빈 줄과 섞어 한 번에 파싱 → 줄 번호까지 확인
+    text = "\n".join(line + "\n" for line, _ in EDGE_CASES)
+    values, bad_lines = parse_label_bytes(text.encode('utf-8'))
+    expected_rows = [v for _, v in EDGE_CASES if v is not None]
+    expected_bad = [2 * i + 1 for i, (_, v) in enumerate(EDGE_CASES) if v is None]
+    ok = [tuple(r) for r in values.tolist()] == expected_rows and [n for n, _ in bad_lines] == expected_bad
+    print(f"edge cases: {len(EDGE_CASES)} lines  {'OK' if ok else 'MISMATCH'}")
+    if not ok:
+        print(f"  rows: {values.tolist()}\n  bad lines: {bad_lines}")
+    return ok
+
+
+def best_time(func, path):
+    best = float('inf')
+    result = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(path)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def make_blowup(src_path, times, dst_path):
+    # 프레임 번호를 이어 붙여 times 배 길이의 라벨 파일 생성
+    with open(src_path, 'r') as f:
+        rows = [line.strip().split(',') for line in f if line.strip()]
+    max_frame = max(int(r[0]) for r in rows)
+    with open(dst_path, 'w') as f:
+        for k in range(times):
+            offset = k * max_frame
+            for r in rows:
+                f.write(f"{int(r[0]) + offset},{','.join(r[1:])}\n")
+
+
+def bench(path):
+    t_old, old = best_time(read_raw_data_legacy, path)
+    t_new, new = best_time(load_track_store, path)
+
+    same = len(old) == len(new) and all(new[frame] == objs for frame, objs in old.items())
+    n_rows = new.num_rows
+    print(f"{os.path.basename(path):<40} {n_rows:>9} {t_old * 1000:>10.1f} {t_new * 1000:>10.1f} "
+          f"{t_old / t_new:>7.1f}x  {'OK' if same else 'MISMATCH'}")
+    return same
+
+
+if __name__ == '__main__':
+    paths = sorted(glob.glob(os.path.join(ASSET_DIR, "*.txt")))
+    if not paths:
+        print(f"[오류] {ASSET_DIR} 에 라벨 파일이 없습니다. 저장소 최상위 폴더에서 실행하세요.")
+        sys.exit(1)
+
+    ok = check_edge_cases()
+    print(f"{'file':<40} {'rows':>9} {'old(ms)':>10} {'new(ms)':>10} {'speedup':>8}")
+    ok = all([bench(p) for p in paths]) and ok
+
+    largest = max(paths, key=os.path.getsize)
+    with tempfile.TemporaryDirectory() as tmp:
+        blowup_path = os.path.join(tmp, f"blowup_x{BLOWUP}.txt")
+        make_blowup(largest, BLOWUP, blowup_path)
+        ok = bench(blowup_path) and ok
+
+    sys.exit(0 if ok else 1)
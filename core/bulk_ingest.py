@@ -0,0 +1,99 @@
+# 📁 bulk_ingest.py
+# 여러 라벨 파일을 프로세스 풀로 동시에 파싱하는 일괄 로더
+# - 각 워커가 라벨 파일을 파싱해 공유 메모리(SharedMemory)에 구조체 배열로 기록
+# - 메인 프로세스는 공유 메모리를 그대로 TrackStore 로 감싸서 사용 (추가 복사 없음)
+# - 파일별 파싱 시간 / 행 수를 함께 반환
+# - 사용이 끝나면 BulkIngestResult.close() 로 공유 메모리 해제
+
+import os, time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory, resource_tracker
+from track_store import TrackStore, TRACK_DTYPE
+from label_cache import load_cached_track_store, DEFAULT_CACHE_DIR
+
+
+# 워커가 만든 공유 메모리 핸들 (Windows 는 핸들이 모두 닫히면 메모리가 사라지므로
+# 메인 프로세스가 붙을 때까지 워커 쪽에서도 열어 둠)
+_worker_segments = []
+
+
+def _parse_to_shared_memory(path, cache_dir):
+    # 워커 프로세스: 파싱 → 공유 메모리 복사 → 이름만 반환
+    start = time.perf_counter()
+    records = load_cached_track_store(path, cache_dir).records
+    shm = shared_memory.SharedMemory(create=True, size=max(records.nbytes, 1))
+    buf = np.ndarray(records.shape, dtype=TRACK_DTYPE, buffer=shm.buf)
+    buf[:] = records
+    del buf
+    _worker_segments.append(shm)
+    if os.name == 'posix':
+        # 해제(unlink)는 메인 프로세스가 담당 → 워커 쪽 resource_tracker 등록 해제
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return path, shm.name, len(records), time.perf_counter() - start
+
+
+class BulkIngestResult:
+
+    def __init__(self):
+        self.stores = {}    # label_path → TrackStore (공유 메모리 기반)
+        self.timings = {}   # label_path → 파싱 시간(초)
+        self.rows = {}      # label_path → 행 수
+        self.errors = {}    # label_path → 예외 메시지
+        self.elapsed = 0.0  # 전체 소요 시간(초)
+        self._shms = []
+
+    def get(self, path, default=None):
+        return self.stores.get(path, default)
+
+    def report(self):
+        lines = []
+        for path, sec in sorted(self.timings.items(), key=lambda kv: -kv[1]):
+            lines.append(f"  {os.path.basename(path)}: {self.rows[path]}행, {sec * 1000:.1f} ms")
+        for path, msg in self.errors.items():
+            lines.append(f"  {os.path.basename(path)}: 실패 ({msg})")
+        lines.append(f"  전체 {len(self.stores)}개 파일, {self.elapsed:.2f} s")
+        return "\n".join(lines)
+
+    def close(self):
+        self.stores.clear()
+        for shm in self._shms:
+            try:
+                shm.close()
+            except BufferError:
+                pass  # 아직 배열 참조가 남아 있으면 매핑은 프로세스 종료 시 해제
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._shms.clear()
+
+
+def ingest_label_files(paths, max_workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    result = BulkIngestResult()
+    start = time.perf_counter()
+    paths = list(dict.fromkeys(paths))  # 중복 제거 (순서 유지)
+
+    if not paths:
+        return result
+
+    max_workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_parse_to_shared_memory, p, cache_dir): p for p in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                _, shm_name, n_rows, sec = future.result()
+            except Exception as e:
+                result.errors[path] = str(e)
+                continue
+
+            shm = shared_memory.SharedMemory(name=shm_name)
+            result._shms.append(shm)
+            records = np.ndarray((n_rows,), dtype=TRACK_DTYPE, buffer=shm.buf)
+            result.stores[path] = TrackStore(records)
+            result.timings[path] = sec
+            result.rows[path] = n_rows
+
+    result.elapsed = time.perf_counter() - start
+    return result
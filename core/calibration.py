@@ -0,0 +1,152 @@
+# 📁 calibration.py
+# 장소(폴더)별 픽셀 → GPS 보정(호모그래피) 관리
+# - 각 장소 폴더의 기준점 CSV (ref_coord.csv: 번호,px,py,lat,lon) 로 호모그래피를 한 번 계산
+# - 계산된 행렬 + 국소 근사 계수는 ./cache/calibration/<장소>.npz 에 저장, CSV 가 바뀌면 자동으로 다시 계산
+# - 장소 키는 pyQT.py 의 get_location_folder_key 와 동일 (영상이 있는 폴더 이름)
+# - 변환은 기준점 중심의 국소 근사(geo.LocalTangentProjector) 사용, 검증 오차가 크면 pyproj 정확 변환
+# - pyproj 가 없으면 보정을 사용하지 않음 (호출 측에서 기존 방식 사용)
+
+import os, csv
+import numpy as np
+import cv2
+from geo import HomographyProjector, LocalTangentProjector, apply_homography, make_local_projector
+
+try:
+    from pyproj import Transformer
+except ImportError:
+    Transformer = None
+
+REF_COORD_FILE = "ref_coord.csv"
+MAP_CRS = "EPSG:5186"   # 중부원점 TM (미터 단위 평면 좌표)
+GPS_CRS = "EPSG:4326"
+DEFAULT_CALIB_CACHE_DIR = "./cache/calibration"
+LOCAL_FIT_KEYS = ['local_origin', 'local_origin_gps', 'local_coef', 'local_radius', 'local_error']
+
+
+def read_ref_points(csv_path):
+    # 기준점 CSV → (픽셀 (N, 2), GPS lat/lon (N, 2))
+    pixels, gps = [], []
+    with open(csv_path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 5 or not row[0].strip():
+                continue
+            try:
+                _, px, py, lat, lon = row[:5]
+                pixels.append((float(px), float(py)))
+                gps.append((float(lat), float(lon)))
+            except ValueError:
+                continue  # 헤더 등 숫자가 아닌 줄
+    return np.array(pixels, dtype=np.float64).reshape(-1, 2), np.array(gps, dtype=np.float64).reshape(-1, 2)
+
+
+class Calibration:
+
+    def __init__(self, location_key, H, ref_pixels, ref_gps, source=None, local_fit=None):
+        # local_fit: 캐시에 저장해 둔 국소 근사 계수 (local_fit() 결과), None 이면 새로 맞춤
+        self.location_key = location_key
+        self.H = np.asarray(H, dtype=np.float64)   # 픽셀 → MAP_CRS 평면 좌표
+        self.ref_pixels = ref_pixels
+        self.ref_gps = ref_gps
+        self.source = source
+        self.exact_projector = HomographyProjector(
+            self.H, Transformer.from_crs(MAP_CRS, GPS_CRS, always_xy=True))
+        if local_fit is None:
+            self.projector = make_local_projector(
+                self.exact_projector, apply_homography(self.H, ref_pixels).mean(axis=0))
+        elif len(local_fit['local_coef']):
+            self.projector = LocalTangentProjector(
+                self.H, self.exact_projector.transformer, local_fit['local_origin'], float(local_fit['local_radius']),
+                origin_gps=local_fit['local_origin_gps'], coef=local_fit['local_coef'])
+            self.projector.max_error_m = float(local_fit['local_error'])
+        else:
+            self.projector = self.exact_projector  # 근사 오차가 허용치를 넘었던 장소
+
+    @classmethod
+    def fit(cls, location_key, ref_pixels, ref_gps, source=None):
+        if len(ref_pixels) < 4:
+            raise ValueError(f"{location_key}: 기준점이 4개 이상 필요합니다 (현재 {len(ref_pixels)}개)")
+        to_map = Transformer.from_crs(GPS_CRS, MAP_CRS, always_xy=True)
+        mx, my = to_map.transform(ref_gps[:, 1], ref_gps[:, 0])
+        H, _ = cv2.findHomography(ref_pixels, np.column_stack((mx, my)))
+        if H is None:
+            raise ValueError(f"{location_key}: 기준점으로 호모그래피를 계산할 수 없습니다 (일직선 배치 등)")
+        return cls(location_key, H, ref_pixels, ref_gps, source)
+
+    def reprojection_error_m(self):
+        # 기준점에서의 최대 재투영 오차 (m, 평면 좌표 기준)
+        to_map = Transformer.from_crs(GPS_CRS, MAP_CRS, always_xy=True)
+        mx, my = to_map.transform(self.ref_gps[:, 1], self.ref_gps[:, 0])
+        pred = apply_homography(self.H, self.ref_pixels)
+        return float(np.hypot(pred[:, 0] - mx, pred[:, 1] - my).max())
+
+    def pixels_to_gps(self, points):
+        return self.projector.pixels_to_gps(points)
+
+    def local_fit(self):
+        # 국소 근사 계수 (캐시 저장용), 정확한 변환을 쓰는 경우 빈 계수
+        p = self.projector
+        if not isinstance(p, LocalTangentProjector):
+            empty = np.zeros(0, dtype=np.float64)
+            return dict(local_origin=empty, local_origin_gps=empty, local_coef=empty,
+                        local_radius=np.array(0.0), local_error=np.array(np.nan))
+        return dict(local_origin=p.origin, local_origin_gps=p.origin_gps, local_coef=p.coef,
+                    local_radius=np.array(p.radius_m), local_error=np.array(p.max_error_m, dtype=np.float64))
+
+
+def _source_stamp(csv_path):
+    st = os.stat(csv_path)
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def load_calibration(location_dir, location_key=None, cache_dir=DEFAULT_CALIB_CACHE_DIR):
+    # 장소 폴더의 보정 로드 (캐시 우선), 기준점 CSV 가 없으면 None
+    if Transformer is None:
+        return None
+    csv_path = os.path.join(location_dir, REF_COORD_FILE)
+    if not os.path.exists(csv_path):
+        return None
+
+    location_key = location_key or os.path.basename(os.path.abspath(location_dir))
+    cache_path = os.path.join(cache_dir, f"{location_key}.npz")
+    stamp = _source_stamp(csv_path)
+
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as z:
+                if np.array_equal(z['stamp'], stamp) and str(z['source']) == os.path.abspath(csv_path):
+                    return Calibration(location_key, z['H'], z['ref_pixels'], z['ref_gps'], csv_path,
+                                       local_fit={k: z[k] for k in LOCAL_FIT_KEYS})
+        except (OSError, ValueError, KeyError):
+            pass
+
+    ref_pixels, ref_gps = read_ref_points(csv_path)
+    calib = Calibration.fit(location_key, ref_pixels, ref_gps, csv_path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, H=calib.H, ref_pixels=ref_pixels, ref_gps=ref_gps, stamp=stamp,
+                 source=np.array(os.path.abspath(csv_path)), **calib.local_fit())
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[WARN] 보정 캐시 저장 실패: {e}")
+
+    print(f"📐 {location_key} 보정 계산 완료 (기준점 {len(ref_pixels)}개, 최대 오차 {calib.reprojection_error_m():.2f} m)")
+    return calib
+
+
+def load_calibrations(video_paths, cache_dir=DEFAULT_CALIB_CACHE_DIR):
+    # 영상들이 속한 장소 폴더마다 보정을 한 번씩 로드 → {장소 키: Calibration}
+    calibrations = {}
+    for video_path in video_paths:
+        key = os.path.basename(os.path.dirname(video_path))  # get_location_folder_key 와 동일
+        if key in calibrations:
+            continue
+        try:
+            calib = load_calibration(os.path.dirname(video_path) or ".", key, cache_dir)
+        except ValueError as e:
+            print(f"[WARN] {e}")
+            continue
+        if calib is not None:
+            calibrations[key] = calib
+    return calibrations
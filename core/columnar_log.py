@@ -0,0 +1,121 @@
+# 📁 columnar_log.py
+# 분석 결과 열(column) 단위 바이너리 저장 (CSV 대체용, .npz)
+# - 행을 chunk_rows 개씩 모아 열별 NumPy 배열(int32 등 고정 타입)로 변환해 압축 npz 안에 청크 단위로 기록
+#   (파일 항목 이름: c00000_frame, c00000_obj_id, ... → np.load 로 그대로 열 수 있음)
+# - 선 통과 / 영역 포함 여부(0/1 열 여러 개)는 행마다 비트로 묶어(packbits) uint8 배열 하나로 저장
+# - 영상 이름은 파일 끝에 한 번만 저장하고 행에는 번호(uint16)만 기록
+# - 압축 / 기록은 전용 스레드 1개에서 순서대로 처리 (GUI 스레드는 배열 변환만)
+# - close() 해야 npz 목차가 기록됨 (close 전에 종료되면 읽을 수 없음)
+# - read_columnar_log(): 전체 청크를 열별 배열로 이어 붙여 반환
+
+import zipfile
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_CHUNK_ROWS = 16384
+
+INT_COLUMNS = ['frame', 'obj_id', 'x1', 'y1', 'x2', 'y2', 'label']
+
+
+def _pack_bits(states, width):
+    # 행별 0/1 리스트 (길이가 달라도 됨) → (N, ceil(width / 8)) uint8
+    bits = np.zeros((len(states), width), dtype=bool)
+    for i, row in enumerate(states):
+        bits[i, :len(row)] = row
+    return np.packbits(bits, axis=1, bitorder='little')
+
+
+def _unpack_bits(packed, width, total_width):
+    bits = np.zeros((len(packed), total_width), dtype=bool)
+    if width:
+        bits[:, :width] = np.unpackbits(packed, axis=1, count=width, bitorder='little').astype(bool)
+    return bits
+
+
+class ColumnarLogWriter:
+
+    def __init__(self, path, chunk_rows=DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.videos = []       # 영상 번호 → 이름
+        self._video_ids = {}
+        self._rows = []        # (영상 번호, frame, obj_id, x1, y1, x2, y2, label)
+        self._lines = []
+        self._areas = []
+        self.n_chunks = 0
+        self.n_rows = 0
+        self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+
+    def append(self, video, frame, obj_id, x1, y1, x2, y2, label, line_states, area_states):
+        vid = self._video_ids.get(video)
+        if vid is None:
+            vid = self._video_ids[video] = len(self.videos)
+            self.videos.append(video)
+        self._rows.append((vid, frame, obj_id, x1, y1, x2, y2, label))
+        self._lines.append(line_states)
+        self._areas.append(area_states)
+        if len(self._rows) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        # 모인 행을 청크 하나로 변환해 기록 스레드로 전달
+        if not self._rows:
+            return
+        rows = np.array(self._rows, dtype=np.int64)
+        n_lines = max(map(len, self._lines))
+        n_areas = max(map(len, self._areas))
+        chunk = {'video': rows[:, 0].astype(np.uint16)}
+        for k, name in enumerate(INT_COLUMNS, start=1):
+            chunk[name] = rows[:, k].astype(np.int32)
+        chunk['lines'] = _pack_bits(self._lines, n_lines)
+        chunk['areas'] = _pack_bits(self._areas, n_areas)
+        chunk['widths'] = np.array([n_lines, n_areas], dtype=np.int32)
+
+        prefix = f"c{self.n_chunks:05d}_"
+        self._pending.append(self._executor.submit(self._write_arrays, prefix, chunk))
+        self.n_chunks += 1
+        self.n_rows += len(rows)
+        self._rows, self._lines, self._areas = [], [], []
+
+    def _write_arrays(self, prefix, arrays):
+        for name, arr in arrays.items():
+            with self._zip.open(prefix + name + '.npy', 'w', force_zip64=True) as f:
+                np.lib.format.write_array(f, np.asarray(arr, order='C'), allow_pickle=False)
+
+    def close(self):
+        if self._zip is None:
+            return
+        self.flush()
+        self._pending.append(self._executor.submit(self._write_arrays, '', {
+            'videos': np.array(self.videos, dtype=str),
+            'n_chunks': np.array(self.n_chunks, dtype=np.int64),
+        }))
+        self._executor.shutdown(wait=True)
+        try:
+            for f in self._pending:
+                f.result()  # 기록 중 발생한 예외 전달
+        finally:
+            self._zip.close()
+            self._zip = None
+
+
+def read_columnar_log(path):
+    # → {'videos': 영상 이름 배열, 'video': 행별 영상 번호, 'frame', 'obj_id', 'x1', ..., 'label',
+    #    'lines': (N, 선 수) bool, 'areas': (N, 영역 수) bool}
+    with np.load(path, allow_pickle=False) as z:
+        n_chunks = int(z['n_chunks'])
+        chunks = [{name: z[f"c{k:05d}_{name}"] for name in ['video', *INT_COLUMNS, 'lines', 'areas', 'widths']}
+                  for k in range(n_chunks)]
+        out = {'videos': z['videos']}
+
+    n_lines = max((int(c['widths'][0]) for c in chunks), default=0)
+    n_areas = max((int(c['widths'][1]) for c in chunks), default=0)
+    for name, dtype in [('video', np.uint16)] + [(name, np.int32) for name in INT_COLUMNS]:
+        out[name] = np.concatenate([c[name] for c in chunks]) if chunks else np.empty(0, dtype=dtype)
+    out['lines'] = (np.concatenate([_unpack_bits(c['lines'], int(c['widths'][0]), n_lines) for c in chunks])
+                    if chunks else np.zeros((0, 0), dtype=bool))
+    out['areas'] = (np.concatenate([_unpack_bits(c['areas'], int(c['widths'][1]), n_areas) for c in chunks])
+                    if chunks else np.zeros((0, 0), dtype=bool))
+    return out
@@ -0,0 +1,98 @@
+# 📁 crossing_events.py
+# 영상 전체 구간의 선 통과 이벤트를 재생 없이 한 번에 계산
+# - TrackStore 의 궤적 인덱스(객체별 프레임 순 중심 좌표)에서 연속 위치 쌍을 모두 선분으로 만들고
+#   line_crossing.crossing_pairs 로 전체 선과 일괄 판정 (선이 많으면 격자 인덱스 후보만)
+# - (obj_id, line_id) 별 첫 통과만 이벤트로 남김 (GUI 의 crossed_lines 중복 제외와 동일)
+# - 결과: 이벤트 표 (frame, obj_id, line_id, label) + 선별 카운트
+#   GUI 는 재생 중 해당 프레임의 이벤트만 조회해서 카운트 반영
+#   (첫 통과만 있으므로 1번 프레임부터 끊김 없이 재생할 때만 프레임 단위 판정과 같음,
+#    이동 / 선 변경 / 객체 정리 후에는 GUI 가 프레임 단위 판정으로 전환)
+
+import numpy as np
+from line_crossing import crossing_pairs, GRID_MIN_LINES
+from spatial_index import GridIndex
+from utils import point_xy
+
+EVENT_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('obj_id', np.int32),
+    ('line_id', np.int32),
+    ('label', np.int32),
+])
+
+CHUNK_SEGMENTS = 65536  # 한 번에 판정할 선분 수 (선분 × 선 bool 배열 크기 제한)
+
+
+class CrossingEvents:
+
+    def __init__(self, events, line_ids, line_pos):
+        self.events = events            # EVENT_DTYPE, 프레임 → 프레임 내 객체 순서 → 선 순서
+        self.line_ids = list(line_ids)  # 계산에 사용한 선 번호 (lines 순서)
+        self.line_pos = line_pos        # 각 이벤트의 선 위치 (line_ids 인덱스)
+        self.counts = self.counts_until(None)
+
+    def __len__(self):
+        return len(self.events)
+
+    def at_frame(self, frame):
+        # 해당 프레임에서 발생한 이벤트 (복사 없는 슬라이스)
+        frames = self.events['frame']
+        lo, hi = np.searchsorted(frames, [frame, frame + 1])
+        return self.events[lo:hi]
+
+    def counts_until(self, frame):
+        # frame 까지(포함) 발생한 선별 통과 수 {line_id: count}, None 이면 전체
+        n = len(self.events) if frame is None else int(np.searchsorted(self.events['frame'], frame, side='right'))
+        counts = np.bincount(self.line_pos[:n], minlength=len(self.line_ids))
+        return {line_id: int(c) for line_id, c in zip(self.line_ids, counts)}
+
+
+def compute_crossing_events(store, lines, start_frame=None, end_frame=None, chunk_segments=CHUNK_SEGMENTS):
+    # store: TrackStore, lines: [(p1, p2, line_id, desc), ...]
+    # start_frame ~ end_frame (포함) 구간의 위치만 사용 (GUI 재생 범위와 맞출 때)
+    line_ids = [l[2] for l in lines]
+    p1 = np.array([point_xy(l[0]) for l in lines], dtype=np.int64).reshape(-1, 2)
+    p2 = np.array([point_xy(l[1]) for l in lines], dtype=np.int64).reshape(-1, 2)
+
+    traj = store.trajectories
+    frames = traj.frame
+
+    # 연속 위치 쌍: 같은 객체의 바로 앞 행 → 현재 행 (GUI 의 prev_positions 와 같은 이전 위치)
+    pair = traj.same_track_as_prev()
+    if start_frame is not None or end_frame is not None:
+        in_range = np.ones(len(frames), dtype=bool)
+        if start_frame is not None:
+            in_range &= frames >= start_frame
+        if end_frame is not None:
+            in_range &= frames <= end_frame
+        pair &= in_range
+        pair[1:] &= in_range[:-1]
+    curr = np.flatnonzero(pair)
+
+    seg_hits, line_hits = [], []
+    if len(line_ids):
+        pts = np.column_stack((traj.cx, traj.cy))
+        index = GridIndex.from_segments(p1, p2) if len(line_ids) >= GRID_MIN_LINES else None
+        for s in range(0, len(curr), chunk_segments):
+            c = curr[s:s + chunk_segments]
+            seg, pos = crossing_pairs(pts[c - 1], pts[c], p1, p2, index)
+            seg_hits.append(c[seg])
+            line_hits.append(pos)
+    hit_rows = np.concatenate(seg_hits) if seg_hits else np.empty(0, dtype=np.int64)
+    hit_pos = np.concatenate(line_hits) if line_hits else np.empty(0, dtype=np.int64)
+
+    # (객체, 선) 별 첫 통과만 남김: 궤적 배열은 (obj_id, frame) 순이므로 처음 나온 것이 가장 이른 통과
+    track = traj.track_ids()[hit_rows]
+    _, first = np.unique(track * max(len(line_ids), 1) + hit_pos, return_index=True)
+    hit_rows, hit_pos = hit_rows[first], hit_pos[first]
+
+    # GUI 처리 순서로 정렬: 원본 행 순서(프레임 → 프레임 내 객체 순서) → 선 순서
+    order = np.lexsort((hit_pos, traj.row_order[hit_rows]))
+    hit_rows, hit_pos = hit_rows[order], hit_pos[order]
+
+    events = np.empty(len(hit_rows), dtype=EVENT_DTYPE)
+    events['frame'] = frames[hit_rows]
+    events['obj_id'] = traj.obj_id[hit_rows]
+    events['line_id'] = np.asarray(line_ids, dtype=np.int64)[hit_pos] if len(line_ids) else []
+    events['label'] = traj.label[hit_rows]
+    return CrossingEvents(events, line_ids, hit_pos)
@@ -0,0 +1,101 @@
+# 📁 decode_worker.py
+# 재생용 백그라운드 디코딩 스레드
+# - 별도 VideoCapture 로 start_frame 부터 순서대로 디코딩 + RGB 변환 후 크기 제한 큐(maxsize)에 미리 쌓아 둠
+#   (큐가 가득 차면 디코딩 대기 → 메모리는 maxsize 프레임 이하)
+# - GUI 타이머는 pop() 으로 꺼내서 표시만 함 (cap.read / cvtColor 가 GUI 스레드에서 빠짐)
+# - 모니터링: depth(현재 큐 길이), underruns(재생 중 큐가 비어 프레임을 못 꺼낸 횟수), max_depth, decoded
+# - 프레임 번호는 GUI 와 같이 1부터
+
+import queue
+import threading
+import cv2
+from keyframes import FrameSeeker
+
+DEFAULT_QUEUE_SIZE = 8
+
+END_OF_STREAM = object()
+
+
+class DecodeWorker:
+
+    def __init__(self, video_path, start_frame=1, keyframes=None, maxsize=DEFAULT_QUEUE_SIZE):
+        self.video_path = video_path
+        self.next_frame = start_frame  # 다음 pop() 이 돌려줄 프레임 번호
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.underruns = 0
+        self.max_depth = 0
+        self.decoded = 0
+        self.finished = False          # 영상 끝 / 읽기 실패까지 모두 꺼냄
+        self._delivered = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(start_frame, keyframes),
+                                        name="decode-worker", daemon=True)
+        self._thread.start()
+
+    @property
+    def depth(self):
+        return self.queue.qsize()
+
+    def pop(self):
+        # → (프레임 번호, RGB 프레임), 아직 준비된 프레임이 없으면 None, 영상 끝이면 END_OF_STREAM
+        if self.finished:
+            return END_OF_STREAM
+        try:
+            item = self.queue.get_nowait()
+        except queue.Empty:
+            if self._delivered:  # 시작 직후 첫 프레임 대기는 제외
+                self.underruns += 1
+            return None
+        if item is END_OF_STREAM:
+            self.finished = True
+            return END_OF_STREAM
+        self._delivered += 1
+        self.next_frame = item[0] + 1
+        return item
+
+    def stop(self):
+        self._stop.set()
+        # 큐가 가득 차서 대기 중인 put 을 풀어줌
+        try:
+            while True:
+                self.queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._thread.join()
+
+    def stats(self):
+        return {'depth': self.depth, 'max_depth': self.max_depth,
+                'underruns': self.underruns, 'decoded': self.decoded}
+
+    def _put(self, item):
+        # 큐에 자리가 날 때까지 대기 (stop 요청 시 False)
+        while not self._stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, start_frame, keyframes):
+        cap = cv2.VideoCapture(self.video_path)
+        try:
+            if start_frame > 1:
+                # start_frame 직전 프레임까지 이동 → 다음 read 가 start_frame
+                if FrameSeeker(cap, keyframes).seek(start_frame - 1) is None:
+                    self._put(END_OF_STREAM)
+                    return
+            frame_idx = start_frame
+            while not self._stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    self._put(END_OF_STREAM)
+                    return
+                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                if not self._put((frame_idx, frame_rgb)):
+                    return
+                self.decoded += 1
+                self.max_depth = max(self.max_depth, self.queue.qsize())
+                frame_idx += 1
+        finally:
+            cap.release()
@@ -0,0 +1,169 @@
+# 📁 dwell.py
+# 영역 체류 구간 계산 (진입 / 이탈 구간 + 체류 시간)
+# - 객체별 · 영역별 안/밖 여부 시계열을 런 길이(run-length)로 묶어 체류 구간으로 변환
+#   구간 = 연속해서 영역 안에 있던 행들 (객체가 잠시 안 보인 프레임은 구간을 끊지 않음, GUI stop_watch 와 동일)
+# - 체류 시간(초) = (마지막 안쪽 프레임 - 진입 프레임) / fps
+# - compute_dwell_intervals(): 라벨 전체(TrackStore 궤적 배열)를 한 번에 계산 (오프라인)
+# - DwellTracker: 재생 중 프레임 단위로 갱신, 이탈한 구간만 반환 (실시간)
+# - merge_zones=True 이면 모든 영역을 하나로 보고 계산 (영역 번호 ANY_ZONE)
+# - write_dwell_csv(): 구간 배열을 영상별 체류 요약 CSV 로 저장 (GUI 에서 영상 전환 / 종료 시)
+
+import os
+import numpy as np
+from collections import namedtuple
+
+ANY_ZONE = -1
+
+INTERVAL_DTYPE = np.dtype([
+    ('obj_id', np.int32),
+    ('zone', np.int32),
+    ('enter_frame', np.int32),
+    ('last_frame', np.int32),   # 마지막으로 영역 안에 있던 프레임
+    ('exit_frame', np.int32),   # 영역 밖에서 처음 관측된 프레임 (-1: 구간 끝까지 이탈 없음)
+    ('last_x', np.int32), ('last_y', np.int32),
+    ('exit_x', np.int32), ('exit_y', np.int32),
+])
+
+
+class DwellInterval(namedtuple('DwellInterval', ['obj_id', 'zone', 'enter_frame', 'last_frame',
+                                                 'exit_frame', 'last_pos', 'exit_pos'])):
+    __slots__ = ()
+
+    def seconds(self, fps):
+        return (self.last_frame - self.enter_frame) / fps
+
+    @property
+    def span_frames(self):
+        return self.last_frame - self.enter_frame
+
+
+def dwell_seconds(intervals, fps):
+    # INTERVAL_DTYPE 배열 → 구간별 체류 시간 (초)
+    return (intervals['last_frame'] - intervals['enter_frame']) / fps
+
+
+def _zone_columns(inside, merge_zones):
+    inside = np.asarray(inside, dtype=bool)
+    if inside.ndim == 1:
+        inside = inside[:, None]
+    if merge_zones:
+        return inside.any(axis=1, keepdims=True), np.array([ANY_ZONE])
+    return inside, np.arange(inside.shape[1])
+
+
+def compute_dwell_intervals(store, zones, start_frame=None, end_frame=None, merge_zones=False):
+    # store: TrackStore, zones: membership(points) 를 가진 영역 객체 (zones.ZoneIndex / ZoneMask)
+    # → INTERVAL_DTYPE 배열 (진입 프레임 → obj_id → 영역 순)
+    traj = store.trajectories
+    rows = np.ones(len(traj.frame), dtype=bool)
+    if start_frame is not None:
+        rows &= traj.frame >= start_frame
+    if end_frame is not None:
+        rows &= traj.frame <= end_frame
+    rows = np.flatnonzero(rows)
+
+    frame, obj_id = traj.frame[rows], traj.obj_id[rows]
+    pts = np.column_stack((traj.cx[rows], traj.cy[rows]))
+    inside, zone_ids = _zone_columns(zones.membership(pts), merge_zones)
+
+    # 같은 객체의 연속 행인지 (궤적 배열은 (obj_id, frame) 순)
+    same_prev = np.zeros(len(rows), dtype=bool)
+    same_prev[1:] = obj_id[1:] == obj_id[:-1]
+    same_next = np.zeros(len(rows), dtype=bool)
+    same_next[:-1] = same_prev[1:]
+
+    out = []
+    for col, zone in enumerate(zone_ids.tolist()):
+        ins = inside[:, col]
+        prev_in = np.zeros_like(ins)
+        prev_in[1:] = ins[:-1]
+        next_in = np.zeros_like(ins)
+        next_in[:-1] = ins[1:]
+
+        # 런 시작: 안쪽이면서 (같은 객체의) 앞 행이 바깥 / 런 끝: 안쪽이면서 뒷 행이 바깥
+        starts = np.flatnonzero(ins & ~(same_prev & prev_in))
+        ends = np.flatnonzero(ins & ~(same_next & next_in))
+        closed = same_next[ends]
+        exit_row = np.where(closed, ends + 1, ends)
+
+        iv = np.empty(len(starts), dtype=INTERVAL_DTYPE)
+        iv['obj_id'] = obj_id[starts]
+        iv['zone'] = zone
+        iv['enter_frame'] = frame[starts]
+        iv['last_frame'] = frame[ends]
+        iv['exit_frame'] = np.where(closed, frame[exit_row], -1)
+        iv['last_x'], iv['last_y'] = pts[ends, 0], pts[ends, 1]
+        iv['exit_x'] = np.where(closed, pts[exit_row, 0], -1)
+        iv['exit_y'] = np.where(closed, pts[exit_row, 1], -1)
+        out.append(iv)
+
+    intervals = np.concatenate(out) if out else np.empty(0, dtype=INTERVAL_DTYPE)
+    return intervals[np.lexsort((intervals['zone'], intervals['obj_id'], intervals['enter_frame']))]
+
+
+class DwellTracker:
+
+    def __init__(self, merge_zones=False):
+        self.merge_zones = merge_zones
+        self.open = {}  # obj_id → {영역: [진입 프레임, 마지막 프레임, (x, y)]}
+
+    def clear(self):
+        self.open.clear()
+
+    def __contains__(self, obj_id):
+        return obj_id in self.open
+
+    def discard_object(self, obj_id):
+        self.open.pop(obj_id, None)
+
+    def current(self, obj_id, zone=None):
+        # 진행 중인 구간 (없으면 None), zone 생략 시 merge_zones 면 ANY_ZONE / 아니면 첫 영역
+        zones = self.open.get(obj_id)
+        if not zones:
+            return None
+        if zone is None:
+            zone = ANY_ZONE if self.merge_zones else min(zones)
+        rec = zones.get(zone)
+        if rec is None:
+            return None
+        return DwellInterval(obj_id, zone, rec[0], rec[1], None, rec[2], None)
+
+    def update(self, frame, obj_ids, inside, positions):
+        # 한 프레임의 객체들 (obj_ids, (N, 영역 수) 안쪽 여부, (N, 2) 중심 좌표) 반영
+        # → 이번 프레임에 이탈한 구간 [DwellInterval, ...] (객체 순서)
+        inside, zone_ids = _zone_columns(inside, self.merge_zones)
+        zone_ids = zone_ids.tolist()
+        exits = []
+        for obj_id, row, pos in zip(obj_ids, inside, positions):
+            pos = tuple(pos)
+            now_in = [zone_ids[k] for k in np.flatnonzero(row).tolist()]
+            zones = self.open.get(obj_id)
+            if zones:
+                for zone in [z for z in zones if z not in now_in]:
+                    enter, last, last_pos = zones.pop(zone)
+                    exits.append(DwellInterval(obj_id, zone, enter, last, frame, last_pos, pos))
+            if now_in:
+                if zones is None:
+                    zones = self.open[obj_id] = {}
+                for zone in now_in:
+                    rec = zones.setdefault(zone, [frame, frame, pos])
+                    rec[1], rec[2] = frame, pos
+            elif zones is not None and not zones:
+                del self.open[obj_id]
+        return exits
+
+
+DWELL_CSV_HEADER = "video,obj_id,area,enter_frame,last_frame,exit_frame,dwell_seconds"
+
+
+def write_dwell_csv(path, video, intervals, fps):
+    # INTERVAL_DTYPE 배열 → CSV 에 추가 (파일이 없으면 헤더부터), 영역 번호는 GUI 와 같이 1부터
+    seconds = np.round(dwell_seconds(intervals, fps), 2)
+    new_file = not os.path.exists(path)
+    with open(path, "a", newline='', encoding='utf-8') as f:
+        if new_file:
+            f.write(DWELL_CSV_HEADER + "\n")
+        for iv, sec in zip(intervals.tolist(), seconds.tolist()):
+            obj_id, zone, enter, last, exit_frame = iv[:5]
+            area = zone + 1 if zone != ANY_ZONE else 0
+            f.write(f"{video},{obj_id},{area},{enter},{last},{exit_frame},{sec}\n")
@@ -0,0 +1,157 @@
+# 📁 frame_cache.py
+# 디코딩된 프레임 캐시 (이전 / 다음 프레임 이동 시 디코더 재사용 없이 바로 표시)
+# - FrameCache: (영상 경로, 프레임 번호) → 프레임 배열, LRU 순서로 보관하고 전체 크기를 budget_mb 이하로 유지
+# - FramePrefetcher: 일시정지 중 현재 프레임 앞뒤 radius 프레임을 백그라운드 스레드에서 미리 디코딩해 캐시에 저장
+#   GUI 의 cap 과 별도의 VideoCapture 를 사용하므로 GUI 디코더 위치에 영향 없음
+#   새 요청 / cancel() 이 들어오면 진행 중인 디코딩은 다음 프레임에서 중단
+#   키프레임 인덱스가 없으면 미리 읽기 안 함 (첫 이동이 0번부터 디코딩이라 중간에 취소할 수 없음)
+# - 프레임 번호는 GUI 와 같이 1부터
+
+import threading
+from collections import OrderedDict
+import cv2
+from keyframes import FrameSeeker
+
+DEFAULT_BUDGET_MB = 512
+DEFAULT_PREFETCH_RADIUS = 30
+
+
+class FrameCache:
+
+    def __init__(self, budget_mb=DEFAULT_BUDGET_MB):
+        self.budget = int(budget_mb * 1024 * 1024)
+        self.frames = OrderedDict()  # (영상, 프레임 번호) → 프레임 (최근 사용 순)
+        self.nbytes = 0
+        self.frame_nbytes = 0  # 마지막으로 저장한 프레임 크기 (미리 읽기 범위 계산용)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, video, frame_idx):
+        key = (video, frame_idx)
+        with self._lock:
+            frame = self.frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self.frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, video, frame_idx, frame):
+        # 예산보다 큰 프레임은 저장하지 않음, 넘치면 오래 안 쓴 프레임부터 제거
+        if frame.nbytes > self.budget:
+            return
+        key = (video, frame_idx)
+        with self._lock:
+            old = self.frames.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self.frames[key] = frame
+            self.nbytes += frame.nbytes
+            self.frame_nbytes = frame.nbytes
+            while self.nbytes > self.budget:
+                _, evicted = self.frames.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self.frames
+
+    def __len__(self):
+        with self._lock:
+            return len(self.frames)
+
+    def capacity_for(self, frame_nbytes):
+        # 이 크기의 프레임을 최대 몇 장 보관할 수 있는지
+        return self.budget // max(frame_nbytes, 1)
+
+    def clear(self):
+        with self._lock:
+            self.frames.clear()
+            self.nbytes = 0
+
+
+class FramePrefetcher:
+
+    def __init__(self, cache, radius=DEFAULT_PREFETCH_RADIUS):
+        self.cache = cache
+        self.radius = radius
+        self._cond = threading.Condition()
+        self._request = None    # (영상, 중심 프레임, 전체 프레임 수, 키프레임)
+        self._generation = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="frame-prefetch", daemon=True)
+        self._thread.start()
+
+    def request(self, video, frame_idx, total_frames, keyframes=None):
+        # frame_idx 앞뒤 프레임 미리 디코딩 요청 (이전 요청은 취소)
+        with self._cond:
+            self._request = (video, frame_idx, total_frames, keyframes)
+            self._generation += 1
+            self._cond.notify_all()
+
+    def cancel(self):
+        # 대기 중 요청 취소 + 진행 중인 디코딩 중단 (재생 시작 시)
+        with self._cond:
+            self._request = None
+            self._generation += 1
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._request = None
+            self._generation += 1
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _current(self, generation):
+        return not self._closed and self._generation == generation
+
+    def _run(self):
+        cap, cap_video, seeker = None, None, None
+        try:
+            while True:
+                with self._cond:
+                    while self._request is None and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    (video, center, total, keyframes), generation = self._request, self._generation
+                    self._request = None
+
+                if video != cap_video:
+                    if cap is not None:
+                        cap.release()
+                    cap, cap_video = cv2.VideoCapture(video), video
+                    seeker = FrameSeeker(cap, keyframes)
+                seeker.keyframes = keyframes
+                self._prefetch(seeker, video, center, total, generation)
+        finally:
+            if cap is not None:
+                cap.release()
+
+    def _prefetch(self, seeker, video, center, total, generation):
+        # 뒤쪽 radius 프레임부터 앞쪽 radius 프레임까지 한 번에 순차 디코딩 (캐시에 이미 있는 구간은 건너뜀)
+        if seeker.keyframes is None:
+            return
+        radius = self.radius
+        if self.cache.frame_nbytes:
+            # 예산 안에 들어가는 만큼만 (앞뒤 합쳐 예산의 절반 이하)
+            radius = min(radius, self.cache.capacity_for(self.cache.frame_nbytes) // 4)
+        start, end = max(center - radius, 1), min(center + radius, total)
+        missing = [i for i in range(start, end + 1) if (video, i) not in self.cache]
+        if not missing:
+            return
+
+        frame = seeker.seek(missing[0])
+        idx = missing[0]
+        while frame is not None and self._current(generation):
+            if (video, idx) not in self.cache:
+                self.cache.put(video, idx, frame)
+            if idx >= missing[-1]:
+                break
+            idx += 1
+            ret, frame = seeker.cap.read()
+            if not ret:
+                break
@@ -0,0 +1,276 @@
+# 📁 geo.py
+# 픽셀 좌표 → GPS 좌표 일괄 변환
+# - 입력은 (N, 2) 픽셀 배열, 출력은 (N, 2) (lat, lon) 배열
+# - 호모그래피는 행렬곱 한 번, pyproj 는 배열 단위 transform 한 번으로 처리
+
+import os, hashlib
+import numpy as np
+
+
+def apply_homography(H, points):
+    # (N, 2) 픽셀 → (N, 2) 평면 좌표 (동차 좌표 나눗셈 포함)
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    homo = pts @ H[:, :2].T + H[:, 2]
+    return homo[:, :2] / homo[:, 2:3]
+
+
+class HomographyProjector:
+    # 픽셀 → (호모그래피) → 투영 좌표계(EPSG:5186 등) → (pyproj) → WGS84 lat/lon
+
+    def __init__(self, H, transformer):
+        self.H = np.asarray(H, dtype=np.float64)
+        self.transformer = transformer  # Transformer.from_crs(투영, "EPSG:4326", always_xy=True)
+
+    def pixels_to_map(self, points):
+        return apply_homography(self.H, points)
+
+    def pixels_to_gps(self, points):
+        xy = self.pixels_to_map(points)
+        if len(xy) == 0:
+            return np.empty((0, 2), dtype=np.float64)
+        lon, lat = self.transformer.transform(xy[:, 0], xy[:, 1])
+        return np.column_stack((lat, lon))
+
+    def pixel_to_gps(self, x, y):
+        lat, lon = self.pixels_to_gps([(x, y)])[0]
+        return float(lat), float(lon)
+
+
+def linear_pixels_to_gps(points, gps1, gps2, px1, px2):
+    # 두 기준점 사이 x 비율로 선형 보간 (pyQT.py 의 pixel_to_gps 와 같은 계산)
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    ratio = (pts[:, 0] - px1[0]) / (px2[0] - px1[0])
+    lat = gps1[0] + ratio * (gps2[0] - gps1[0])
+    lon = gps1[1] + ratio * (gps2[1] - gps1[1])
+    return np.column_stack((lat, lon))
+
+
+def box_centers(boxes):
+    # (N, 4) x1, y1, x2, y2 → (N, 2) 중심 좌표 (GUI 와 동일하게 int((a + b) / 2))
+    boxes = np.asarray(boxes).reshape(-1, 4)
+    cx = ((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int64)
+    cy = ((boxes[:, 1] + boxes[:, 3]) / 2).astype(np.int64)
+    return np.column_stack((cx, cy))
+
+
+# ── 사전 계산 GPS 조회 격자 ──────────────────────────
+# 고정 카메라 + 고정 호모그래피에서는 같은 픽셀이 항상 같은 좌표로 변환되므로
+# stride 간격 격자점의 정확한 lat/lon 을 미리 계산해 두고 쌍선형 보간으로 조회
+# - 셀마다 정확한 변환과의 오차를 측정해 허용 오차(error_tol_m) 를 넘는 셀은 사용하지 않음
+#   (지평선 근처처럼 호모그래피가 급격히 변하는 영역) → 그 셀의 점은 정확한 변환으로 계산
+
+DEFAULT_GRID_CACHE_DIR = "./cache/geo"
+METERS_PER_DEG_LAT = 111320.0
+
+
+def gps_error_meters(a, b):
+    # (N, 2) lat/lon 두 배열 사이 거리 (m, 짧은 거리용 근사)
+    a, b = np.asarray(a, dtype=np.float64), np.asarray(b, dtype=np.float64)
+    dlat = (a[:, 0] - b[:, 0]) * METERS_PER_DEG_LAT
+    dlon = (a[:, 1] - b[:, 1]) * METERS_PER_DEG_LAT * np.cos(np.radians(b[:, 0]))
+    return np.hypot(dlat, dlon)
+
+
+class GpsLookupGrid:
+
+    def __init__(self, lat, lon, stride, width, height, valid, max_error_m, projector=None):
+        self.lat = lat                  # (격자 행, 격자 열) 격자점 위도
+        self.lon = lon                  # (격자 행, 격자 열) 격자점 경도
+        self.stride = stride
+        self.width = width
+        self.height = height
+        self.valid = valid              # (격자 행 - 1, 격자 열 - 1) 보간 사용 가능한 셀
+        self.max_error_m = max_error_m  # 사용 가능한 셀에서 측정한 최대 오차 (m)
+        self.projector = projector      # 사용 불가 셀의 정확한 변환용
+
+    @classmethod
+    def build(cls, projector, width=1920, height=1080, stride=8, error_tol_m=0.05):
+        # 격자점은 0, stride, 2*stride, ... 로 화면 끝(width-1, height-1)까지 덮음
+        xs = np.arange(0, width - 1 + stride, stride, dtype=np.float64)
+        ys = np.arange(0, height - 1 + stride, stride, dtype=np.float64)
+        gx, gy = np.meshgrid(xs, ys)
+        nodes = np.column_stack((gx.ravel(), gy.ravel()))
+        gps = projector.pixels_to_gps(nodes)
+
+        # 호모그래피 분모가 0 이하인 격자점 (지평선 너머) 이 있는 셀은 사용 불가
+        w = (nodes @ projector.H[2, :2] + projector.H[2, 2]).reshape(gx.shape)
+        valid = (w[:-1, :-1] > 0) & (w[:-1, 1:] > 0) & (w[1:, :-1] > 0) & (w[1:, 1:] > 0)
+
+        grid = cls(gps[:, 0].reshape(gx.shape), gps[:, 1].reshape(gx.shape),
+                   stride, width, height, valid, 0.0, projector)
+
+        # 셀별 오차 측정: 각 셀의 중심 / 변 중간점에서 정확한 변환과 비교
+        cell_err = grid.measure_cell_error(projector)
+        grid.valid &= cell_err <= error_tol_m
+        grid.max_error_m = float(cell_err[grid.valid].max()) if grid.valid.any() else 0.0
+        return grid
+
+    def _cells(self, pts):
+        u = pts[:, 0] / self.stride
+        v = pts[:, 1] / self.stride
+        # 화면 밖 좌표는 가장자리 셀로 선형 외삽
+        i = np.clip(np.floor(v).astype(np.int64), 0, self.valid.shape[0] - 1)
+        j = np.clip(np.floor(u).astype(np.int64), 0, self.valid.shape[1] - 1)
+        return i, j, u - j, v - i
+
+    def _interpolate(self, i, j, fu, fv):
+        out = np.empty((len(i), 2), dtype=np.float64)
+        for k, table in enumerate((self.lat, self.lon)):
+            top = table[i, j] * (1 - fu) + table[i, j + 1] * fu
+            bottom = table[i + 1, j] * (1 - fu) + table[i + 1, j + 1] * fu
+            out[:, k] = top * (1 - fv) + bottom * fv
+        return out
+
+    def pixels_to_gps(self, points):
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        i, j, fu, fv = self._cells(pts)
+        out = self._interpolate(i, j, fu, fv)
+
+        bad = ~self.valid[i, j]
+        if bad.any():
+            if self.projector is None:
+                out[bad] = np.nan
+            else:
+                out[bad] = self.projector.pixels_to_gps(pts[bad])
+        return out
+
+    def pixel_to_gps(self, x, y):
+        lat, lon = self.pixels_to_gps([(x, y)])[0]
+        return float(lat), float(lon)
+
+    def measure_cell_error(self, projector):
+        # 반 칸 간격 표본점 (격자점 / 변 중간점 / 셀 중심) 의 셀별 최대 오차 (m)
+        half = self.stride / 2
+        gx, gy = np.meshgrid(np.arange(0, self.width, half), np.arange(0, self.height, half))
+        pts = np.column_stack((gx.ravel(), gy.ravel()))
+        i, j, fu, fv = self._cells(pts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            err = gps_error_meters(self._interpolate(i, j, fu, fv), projector.pixels_to_gps(pts))
+        err[~np.isfinite(err)] = np.inf
+
+        cell_err = np.zeros(self.valid.shape, dtype=np.float64)
+        np.maximum.at(cell_err, (i, j), err)
+        return cell_err
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, lat=self.lat, lon=self.lon, valid=self.valid,
+                 meta=np.array([self.stride, self.width, self.height], dtype=np.int64),
+                 max_error_m=np.array(self.max_error_m))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, projector=None):
+        with np.load(path, allow_pickle=False) as z:
+            stride, width, height = (int(v) for v in z['meta'])
+            return cls(z['lat'], z['lon'], stride, width, height, z['valid'],
+                       float(z['max_error_m']), projector)
+
+
+def grid_cache_path(camera_key, H, width, height, stride, error_tol_m, cache_dir=DEFAULT_GRID_CACHE_DIR):
+    # 카메라별 캐시 파일 (호모그래피 / 해상도 / 간격 / 허용 오차가 바뀌면 파일명이 바뀜)
+    h = hashlib.sha1(np.asarray(H, dtype=np.float64).tobytes())
+    h.update(f"{width}x{height}/{stride}/{error_tol_m}".encode())
+    return os.path.join(cache_dir, f"{camera_key}_{h.hexdigest()[:12]}.npz")
+
+
+def load_or_build_grid(projector, camera_key, width=1920, height=1080, stride=8,
+                       error_tol_m=0.05, cache_dir=DEFAULT_GRID_CACHE_DIR):
+    path = grid_cache_path(camera_key, projector.H, width, height, stride, error_tol_m, cache_dir)
+    if os.path.exists(path):
+        try:
+            return GpsLookupGrid.load(path, projector)
+        except (OSError, ValueError, KeyError):
+            pass
+    grid = GpsLookupGrid.build(projector, width, height, stride, error_tol_m)
+    try:
+        grid.save(path)
+    except OSError as e:
+        print(f"[WARN] GPS 격자 캐시 저장 실패: {e}")
+    return grid
+
+
+# ── 국소 접평면 근사 ────────────────────────────────
+# 카메라 한 대가 보는 범위(수백 m) 안에서는 투영 좌표(m) → lat/lon 이 거의 선형이므로
+# 기준점 중심 주변에서 근사식(1차 + 2차 보정항)을 맞춰 두고 pyproj 없이 NumPy 연산만으로 변환
+# - validate() 로 정확한 pyproj 변환과의 최대 편차(m) 측정
+# - make_local_projector() 는 편차가 허용치를 넘으면 정확한 변환(HomographyProjector)을 그대로 반환
+# - 근사 범위(중심 ± radius_m) 밖의 점은 항상 정확한 변환으로 계산
+
+LOCAL_RADIUS_M = 1000.0
+LOCAL_TOL_M = 0.01
+
+
+def _local_terms(d):
+    # (N, 2) 중심 기준 오프셋 (m) → 근사식 항 (1, dx, dy, dx², dx·dy, dy²), 값 크기를 맞추기 위해 km 단위
+    dx, dy = d[:, 0] / 1000.0, d[:, 1] / 1000.0
+    return np.column_stack((np.ones_like(dx), dx, dy, dx * dx, dx * dy, dy * dy))
+
+
+class LocalTangentProjector:
+
+    def __init__(self, H, transformer, origin, radius_m=LOCAL_RADIUS_M, origin_gps=None, coef=None):
+        self.H = np.asarray(H, dtype=np.float64)
+        self.transformer = transformer          # 범위 밖 점 / 검증용 정확한 변환
+        self.origin = np.asarray(origin, dtype=np.float64).reshape(2)  # 근사 중심 (투영 좌표, m)
+        self.radius_m = float(radius_m)
+        self.max_error_m = None                 # validate() 결과
+        if coef is not None:
+            # 저장해 둔 계수 사용 (다시 맞추지 않음)
+            self.origin_gps = np.asarray(origin_gps, dtype=np.float64).reshape(2)
+            self.coef = np.asarray(coef, dtype=np.float64).reshape(-1, 2)
+            return
+
+        # 중심 ± radius_m 정사각형 격자에서 정확한 lat/lon 을 구해 최소제곱으로 계수 결정
+        # (중심의 lat/lon 을 빼고 맞춰 큰 값 때문에 정밀도가 떨어지지 않게 함)
+        d = self._sample_offsets(9)
+        exact = self._exact(self.origin + d)
+        self.origin_gps = self._exact(self.origin[None, :])[0]
+        self.coef, *_ = np.linalg.lstsq(_local_terms(d), exact - self.origin_gps, rcond=None)
+
+    def _sample_offsets(self, n, shift=0.0):
+        t = (np.arange(n) + shift) / (n - 1) * 2 - 1
+        gx, gy = np.meshgrid(t * self.radius_m, t * self.radius_m)
+        d = np.column_stack((gx.ravel(), gy.ravel()))
+        return d[(np.abs(d) <= self.radius_m).all(axis=1)]
+
+    def _exact(self, xy):
+        lon, lat = self.transformer.transform(xy[:, 0], xy[:, 1])
+        return np.column_stack((lat, lon))
+
+    def map_to_gps(self, xy):
+        xy = np.asarray(xy, dtype=np.float64).reshape(-1, 2)
+        d = xy - self.origin
+        out = self.origin_gps + _local_terms(d) @ self.coef
+        far = ~(np.abs(d) <= self.radius_m).all(axis=1)  # NaN / 지평선 너머 포함
+        if far.any():
+            out[far] = self._exact(xy[far])
+        return out
+
+    def pixels_to_map(self, points):
+        return apply_homography(self.H, points)
+
+    def pixels_to_gps(self, points):
+        return self.map_to_gps(self.pixels_to_map(points))
+
+    def pixel_to_gps(self, x, y):
+        lat, lon = self.pixels_to_gps([(x, y)])[0]
+        return float(lat), float(lon)
+
+    def validate(self, n=25):
+        # 근사 범위 안 표본점 (맞춤 격자와 겹치지 않게 반 칸 이동) 에서 pyproj 와의 최대 편차 (m)
+        xy = self.origin + self._sample_offsets(n + 1, shift=0.5)
+        err = gps_error_meters(self.origin_gps + _local_terms(xy - self.origin) @ self.coef, self._exact(xy))
+        self.max_error_m = float(err.max())
+        return self.max_error_m
+
+
+def make_local_projector(projector, origin, radius_m=LOCAL_RADIUS_M, tol_m=LOCAL_TOL_M):
+    # 정확한 projector 로 국소 근사를 만들고 검증, 허용 오차를 넘으면 정확한 projector 반환
+    local = LocalTangentProjector(projector.H, projector.transformer, origin, radius_m)
+    err = local.validate()
+    if not err <= tol_m:
+        print(f"[WARN] 국소 좌표 근사 오차 {err * 100:.2f} cm > 허용치 {tol_m * 100:.2f} cm → pyproj 변환 사용")
+        return projector
+    return local
@@ -18,6 +18,7 @@ from PyQt5.QtCore import QTimer, Qt, QPoint
 from PyQt5.QtGui import QImage, QPixmap, QKeyEvent, QPainter, QPen, QFont, QBrush, QColor
 from datetime import datetime
 from utils import point_in_polygon
+from label_cache import load_cached_track_store
 
 # 로그 폴더 없으면 생성
 if not os.path.exists("logs"):
@@ -47,18 +48,9 @@ LABEL_NAMES = {
 }
 
 def read_raw_data(path):
-        frame_data = {}
-        with open(path, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                values = list(map(int, line.split(',')))
-                frame, obj_id, x1, y1, x2, y2, label = values
-                if frame not in frame_data:
-                    frame_data[frame] = []
-                frame_data[frame].append((obj_id, x1, y1, x2, y2, label))
-        return frame_data
+        # 프레임별 객체 목록을 TrackStore(NumPy 구조체 배열)로 반환
+        # 한 번 파싱한 라벨은 ./cache/labels 에 .npy 로 저장되어 다음부터는 mmap 으로 로드
+        return load_cached_track_store(path)
     
 def pixel_to_gps(x, y):
     gps1 = (37.401383, 127.112679)
@@ -0,0 +1,248 @@
+# 📁 keyframes.py
+# 키프레임 인덱스 기반 프레임 이동 (safe_seek 의 0번부터 디코딩 대체)
+# - MP4 moov 헤더의 sync sample 표(stss)에서 키프레임 번호를 읽음 (영상 데이터는 읽지 않음)
+#   B 프레임이 있으면 디코딩 순서 ≠ 표시 순서이므로 stts / ctts 로 표시 순서 번호로 변환
+# - 이동: 목표 이전의 가장 가까운 키프레임으로 cap.set 후, 목표까지만 grab() 으로 디코딩
+#   현재 디코더 위치가 같은 키프레임 구간 안이면 cap.set 없이 앞으로만 디코딩 (다음 프레임 이동 등)
+# - 처음 열 때 한 번 검증: 첫 키프레임 구간을 순서대로 디코딩한 결과와 cap.set 이동 결과가 같은지 비교
+#   다르면(컨테이너 / 코덱 문제로 OpenCV 이동이 부정확) 인덱스를 쓰지 않고 기존처럼 0번부터 디코딩
+#   첫 키프레임이 멀어도(긴 GOP) 검증은 항상 수행 (영상마다 한 번, 결과는 캐시에 저장)
+# - 인덱스 + 검증 결과는 ./cache/keyframes 에 저장, 영상 파일이 바뀌면 다시 계산
+# - 프레임 번호: seek() 인자는 GUI 와 같이 1부터, 내부 / 캐시는 0부터
+
+import os, struct, hashlib
+import numpy as np
+import cv2
+
+DEFAULT_CACHE_DIR = "./cache/keyframes"
+VALIDATE_NOTICE_FRAMES = 600  # 검증용 순차 디코딩이 이보다 길면 안내 출력
+
+_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+
+
+def _iter_boxes(data, start, end):
+    # data[start:end] 안의 MP4 박스 → (종류, 내용 시작, 박스 끝)
+    pos = start
+    while pos + 8 <= end:
+        size, kind = struct.unpack_from('>I4s', data, pos)
+        header = 8
+        if size == 1:
+            size = struct.unpack_from('>Q', data, pos + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header or pos + size > end:
+            return
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _read_moov(path):
+    # 파일 최상위 박스 중 moov 만 읽어 반환 (mdat 등은 건너뜀), 없으면 None
+    with open(path, 'rb') as f:
+        file_size = os.fstat(f.fileno()).st_size
+        pos = 0
+        while pos + 8 <= file_size:
+            f.seek(pos)
+            head = f.read(16)
+            if len(head) < 8:
+                return None
+            size, kind = struct.unpack_from('>I4s', head)
+            header = 8
+            if size == 1:
+                if len(head) < 16:
+                    return None
+                size = struct.unpack_from('>Q', head, 8)[0]
+                header = 16
+            elif size == 0:
+                size = file_size - pos
+            if size < header:
+                return None
+            if kind == b'moov':
+                f.seek(pos + header)
+                return f.read(size - header)
+            pos += size
+    return None
+
+
+def _find_video_stbl(moov):
+    # moov 안의 영상 트랙(hdlr = 'vide') 의 stbl 하위 박스들 {종류: (시작, 끝)}
+    for kind, s, e in _iter_boxes(moov, 0, len(moov)):
+        if kind != b'trak':
+            continue
+        boxes = {}
+        stack = [(s, e)]
+        handler = None
+        while stack:
+            bs, be = stack.pop()
+            for k, cs, ce in _iter_boxes(moov, bs, be):
+                if k in _CONTAINER_BOXES:
+                    stack.append((cs, ce))
+                elif k == b'hdlr':
+                    handler = moov[cs + 8:cs + 12]
+                else:
+                    boxes[k] = (cs, ce)
+        if handler == b'vide':
+            return boxes
+    return None
+
+
+def _table(moov, box, fields):
+    # 버전/플래그(4) + 개수(4) + 개수 × fields 개 uint32 → (개수, fields) 배열
+    s, e = box
+    count = struct.unpack_from('>I', moov, s + 4)[0]
+    arr = np.frombuffer(moov, dtype='>u4', count=count * fields, offset=s + 8)
+    return arr.reshape(count, fields).astype(np.int64)
+
+
+def read_mp4_keyframes(path):
+    # MP4 영상 트랙의 키프레임 (0부터, 표시 순서) 배열, 읽을 수 없으면 None
+    try:
+        moov = _read_moov(path)
+        if moov is None:
+            return None
+        boxes = _find_video_stbl(moov)
+        if boxes is None or b'stsz' not in boxes:
+            return None
+        s, _ = boxes[b'stsz']
+        n_samples = struct.unpack_from('>I', moov, s + 8)[0]
+        if n_samples == 0:
+            return None  # fragmented MP4 (moof) 등
+
+        if b'stss' in boxes:
+            sync = _table(moov, boxes[b'stss'], 1)[:, 0] - 1  # 1부터 → 0부터 (디코딩 순서)
+        else:
+            sync = np.arange(n_samples)  # stss 없음 = 모든 샘플이 키프레임
+
+        if b'ctts' in boxes and b'stts' in boxes:
+            # 디코딩 시각 + 합성 오프셋 = 표시 시각 → 표시 순서 번호
+            stts = _table(moov, boxes[b'stts'], 2)
+            ctts = _table(moov, boxes[b'ctts'], 2)
+            dts = np.concatenate(([0], np.cumsum(np.repeat(stts[:, 1], stts[:, 0]))))[:n_samples]
+            offsets = np.repeat(ctts[:, 1].astype(np.uint32).view(np.int32), ctts[:, 0])[:n_samples]
+            pts = dts + np.pad(offsets, (0, n_samples - len(offsets)))
+            rank = np.empty(n_samples, dtype=np.int64)
+            rank[np.argsort(pts, kind='stable')] = np.arange(n_samples)
+            sync = rank[sync[sync < n_samples]]
+        keyframes = np.unique(sync[(sync >= 0) & (sync < n_samples)])
+    except (OSError, struct.error, ValueError):
+        return None
+    if len(keyframes) == 0 or keyframes[0] != 0:
+        keyframes = np.concatenate(([0], keyframes))
+    return keyframes.astype(np.int64)
+
+
+def _cache_path(video_path, cache_dir):
+    key = hashlib.sha1(os.path.abspath(video_path).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{key}.npz")
+
+
+def _source_stamp(video_path):
+    st = os.stat(video_path)
+    return np.array([st.st_size, st.st_mtime_ns], dtype=np.int64)
+
+
+def _grab(cap, n):
+    # n 프레임 디코딩만 (색 변환 / 복사 없음), 실패 시 False
+    for _ in range(n):
+        if not cap.grab():
+            return False
+    return True
+
+
+def validate_seek(cap, keyframes):
+    # 첫 키프레임 구간(0 → k) 순차 디코딩 결과와 cap.set(k) 이동 결과 비교
+    if len(keyframes) <= 1:
+        return True  # 키프레임이 0번뿐 → 항상 0번부터 (기존과 동일)
+    k = int(keyframes[1])
+    if k > VALIDATE_NOTICE_FRAMES:
+        print(f"⏳ 키프레임 이동 검증 중 (첫 키프레임까지 {k} 프레임 디코딩, 영상마다 한 번)")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    if not _grab(cap, k):
+        return False
+    ok1, expected = cap.read()
+    ok2, expected_next = cap.read()
+    cap.set(cv2.CAP_PROP_POS_FRAMES, k)
+    ok3, got = cap.read()
+    ok4, got_next = cap.read()
+    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    if not (ok1 and ok3):
+        return False
+    if not np.array_equal(expected, got):
+        return False
+    return ok2 == ok4 and (not ok2 or np.array_equal(expected_next, got_next))
+
+
+def load_keyframe_index(video_path, cap, cache_dir=DEFAULT_CACHE_DIR):
+    # 캐시된 키프레임 인덱스 로드 (없으면 계산 + 검증 후 저장)
+    # → 키프레임 배열, 사용할 수 없으면 None (0번부터 디코딩)
+    cache_path = _cache_path(video_path, cache_dir)
+    stamp = _source_stamp(video_path)
+
+    if os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as z:
+                if np.array_equal(z['stamp'], stamp) and str(z['source']) == os.path.abspath(video_path):
+                    return z['keyframes'] if bool(z['valid']) else None
+        except (OSError, ValueError, KeyError):
+            pass
+
+    keyframes = read_mp4_keyframes(video_path)
+    valid = keyframes is not None and validate_seek(cap, keyframes)
+    if keyframes is None:
+        print(f"[WARN] 키프레임 인덱스를 읽을 수 없음 (0번부터 디코딩): {os.path.basename(video_path)}")
+    elif not valid:
+        print(f"[WARN] 키프레임 이동 검증 실패 (0번부터 디코딩): {os.path.basename(video_path)}")
+    else:
+        print(f"🔑 키프레임 {len(keyframes)}개 인덱스 생성: {os.path.basename(video_path)}")
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, keyframes=keyframes if keyframes is not None else np.zeros(0, dtype=np.int64),
+                 valid=np.array(valid), stamp=stamp, source=np.array(os.path.abspath(video_path)))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"[WARN] 키프레임 캐시 저장 실패: {e}")
+
+    return keyframes if valid else None
+
+
+class FrameSeeker:
+
+    def __init__(self, cap, keyframes=None):
+        self.cap = cap
+        self.keyframes = keyframes  # None 이면 항상 0번부터 디코딩
+
+    @classmethod
+    def open(cls, cap, video_path, cache_dir=DEFAULT_CACHE_DIR):
+        return cls(cap, load_keyframe_index(video_path, cap, cache_dir))
+
+    def keyframe_before(self, index):
+        # index(0부터) 이하의 가장 가까운 키프레임
+        if self.keyframes is None:
+            return 0
+        pos = np.searchsorted(self.keyframes, index, side='right') - 1
+        return int(self.keyframes[max(pos, 0)])
+
+    def seek(self, target_frame):
+        # target_frame(1부터) 프레임을 디코딩해 반환 (BGR), 실패 시 None
+        # 호출 후 디코더 위치는 target_frame 바로 다음 (safe_seek 와 동일)
+        target = target_frame - 1
+        key = self.keyframe_before(target)
+        current = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))  # 다음에 읽을 프레임 (0부터)
+        if key <= current <= target:
+            start = current  # 같은 키프레임 구간 안 → 이동 없이 앞으로만
+        else:
+            start = key
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+        for i in range(start, target):
+            if not self.cap.grab():
+                print(f"[ERROR] Frame {i + 1} read failed during seek")
+
+        ret, frame = self.cap.read()
+        if not ret or frame is None:
+            print(f"[ERROR] Frame {target_frame} read failed at target")
+            return None
+        return frame
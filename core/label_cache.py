@@ -0,0 +1,76 @@
+# 📁 label_cache.py
+# 파싱된 라벨 파일을 .npy 바이너리로 캐시하는 모듈
+# - 캐시 키: 라벨 파일 절대경로 + 파일 크기 + 수정 시각(mtime)
+# - 원본이 바뀌면 키가 달라지므로 자동 무효화 (이전 캐시 파일은 삭제)
+# - 캐시 적중 시 텍스트 파싱 없이 np.load(mmap_mode='r') 한 번으로 로드
+
+import os, hashlib
+import numpy as np
+from track_store import TrackStore, TRACK_DTYPE, load_track_store
+
+DEFAULT_CACHE_DIR = "./cache/labels"
+
+
+def _path_key(path):
+    abs_path = os.path.abspath(path)
+    return hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:16]
+
+
+def cache_file_path(path, cache_dir=DEFAULT_CACHE_DIR):
+    st = os.stat(path)
+    name = f"{_path_key(path)}_{st.st_size}_{st.st_mtime_ns}.npy"
+    return os.path.join(cache_dir, name)
+
+
+def _remove_stale(path, cache_dir, keep):
+    # 같은 라벨 파일의 예전 버전 캐시 삭제
+    prefix = _path_key(path) + "_"
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and name.endswith(".npy") and full != keep:
+            try:
+                os.remove(full)
+            except OSError:
+                pass
+
+
+def _try_load(cache_path):
+    try:
+        records = np.load(cache_path, mmap_mode='r', allow_pickle=False)
+    except (OSError, ValueError):
+        return None
+    if records.dtype != TRACK_DTYPE:
+        return None
+    return records
+
+
+def load_cached_track_store(path, cache_dir=DEFAULT_CACHE_DIR):
+    # 캐시가 있으면 mmap 으로 열고, 없으면 파싱 후 캐시 저장
+    cache_path = cache_file_path(path, cache_dir)
+
+    if os.path.exists(cache_path):
+        records = _try_load(cache_path)
+        if records is not None:
+            return TrackStore(records)
+
+    store = load_track_store(path)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + f".{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, store.records, allow_pickle=False)
+        os.replace(tmp_path, cache_path)  # 쓰다 만 캐시가 보이지 않도록 교체
+        _remove_stale(path, cache_dir, keep=cache_path)
+    except OSError as e:
+        print(f"[WARN] 라벨 캐시 저장 실패: {e}")
+
+    return store
+
+
+def clear_label_cache(cache_dir=DEFAULT_CACHE_DIR):
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npy"):
+            os.remove(os.path.join(cache_dir, name))
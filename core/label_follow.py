@@ -0,0 +1,96 @@
+# 📁 label_follow.py
+# 트래커가 아직 기록 중인 라벨 파일을 따라가며 읽는 follow(tail) 모드
+# - 마지막으로 읽은 바이트 위치를 기억하고, poll() 시 새로 추가된 바이트만 파싱
+# - 쓰는 중인 마지막 줄(줄바꿈 전)은 다음 poll 까지 보류
+# - 새 행은 여유 용량이 있는 버퍼 뒤에 붙이고, 프레임 인덱스도 뒤쪽만 갱신
+# - 파일이 줄어들면(덮어쓰기 등) 처음부터 다시 읽음
+# - TrackStore 를 상속하므로 VideoWindow 에서는 frame_data 로 그대로 사용
+
+import os
+import numpy as np
+from label_parser import parse_label_bytes
+from track_store import TrackStore, TRACK_DTYPE, records_from_array
+
+
+class LabelFollower(TrackStore):
+
+    def __init__(self, path, initial_capacity=4096):
+        super().__init__(np.empty(0, dtype=TRACK_DTYPE))
+        self.path = path
+        self._buf = np.empty(initial_capacity, dtype=TRACK_DTYPE)
+        self._n = 0
+        self._offset = 0    # 지금까지 파싱한 바이트 위치 (완성된 줄 끝)
+        self._line_no = 1   # 다음에 파싱할 줄 번호 (오류 메시지용)
+        self.poll()
+
+    def _reset(self):
+        self._n = 0
+        self._offset = 0
+        self._line_no = 1
+        TrackStore.__init__(self, self._buf[:0])
+
+    def poll(self):
+        # 새로 추가된 줄을 읽어 인덱스에 반영, 추가된 행 수 반환
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+        if size < self._offset:
+            print(f"[WARN] 라벨 파일이 줄어들어 처음부터 다시 읽습니다: {self.path}")
+            self._reset()
+        if size == self._offset:
+            return 0
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(size - self._offset)
+
+        cut = data.rfind(b'\n') + 1
+        if cut == 0:
+            return 0  # 아직 줄이 완성되지 않음
+        values, bad_lines = parse_label_bytes(data[:cut], first_line=self._line_no)
+        self._offset += cut
+        self._line_no += data.count(b'\n', 0, cut)
+
+        for line_no, text in bad_lines:
+            print(f"[WARN] {self.path}:{line_no} 잘못된 라벨 줄 건너뜀: {text}")
+
+        if len(values):
+            self._append(records_from_array(values))
+        return len(values)
+
+    def _append(self, new):
+        # 버퍼 용량 확보 (2배씩 증가)
+        need = self._n + len(new)
+        if need > len(self._buf):
+            grown = np.empty(max(need, len(self._buf) * 2), dtype=TRACK_DTYPE)
+            grown[:self._n] = self._buf[:self._n]
+            self._buf = grown
+
+        new_frames = new['frame']
+        last_frame = int(self.records['frame'][-1]) if self._n else -1
+        in_order = new_frames[0] >= last_frame and not np.any(new_frames[1:] < new_frames[:-1])
+
+        self._buf[self._n:need] = new
+        self._n = need
+
+        if not in_order:
+            # 순서가 뒤섞인 추가분 → 전체 재정렬 (드문 경우)
+            TrackStore.__init__(self, self._buf[:self._n])
+            self._buf[:self._n] = self.records
+            self.records = self._buf[:self._n]
+            return
+
+        self.records = self._buf[:self._n]
+        frames = self.records['frame']
+
+        # 프레임 인덱스: 이전 마지막 프레임(행이 늘어날 수 있음)부터 뒤쪽만 다시 계산
+        keep = max(len(self.frames) - 1, 0)
+        base = int(self.frame_starts[keep])
+        tail_frames = frames[base:]
+        change = np.flatnonzero(np.concatenate(([True], tail_frames[1:] != tail_frames[:-1])))
+        self.frames = np.concatenate((self.frames[:keep], tail_frames[change]))
+        self.frame_starts = np.concatenate((self.frame_starts[:keep], base + change, [len(frames)])).astype(np.int64)
+
+        self._trajectories = None  # 궤적 인덱스는 다음 접근 시 다시 생성
@@ -0,0 +1,153 @@
+# 📁 label_parser.py
+# 라벨 텍스트(frame,id,x1,y1,x2,y2,label) 고속 파서
+# - 파일을 바이트 단위로 한 번에 읽어 NumPy 로 전체 문자를 벡터 연산으로 숫자 변환
+#   (줄마다 strip / split / int 호출 없음)
+# - 잘못된 줄은 int() 예외로 멈추지 않고 줄 번호와 함께 보고 후 건너뜀
+#   (TrackStore 는 int32 로 저장하므로 int32 범위를 벗어난 값이 있는 줄도 잘못된 줄로 처리)
+# - 공백 / 탭 / \r 은 값 앞뒤(쉼표 / 줄 끝 옆)에서만 허용, 숫자 사이 공백('1 2')은 int() 와 같이 잘못된 값
+# - 큰 파일은 CHUNK_BYTES 단위(줄 경계 기준)로 나누어 처리해 임시 배열 크기를 제한
+
+import numpy as np
+
+NUM_FIELDS = 7
+CHUNK_BYTES = 4 * 1024 * 1024
+MAX_DIGITS = 10  # int32 최대 자릿수 (int64 로 변환 후 범위 검사)
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+# 문자 분류표: 바이트 값 → 종류
+_DIGIT, _COMMA, _NL, _MINUS, _SPACE, _BAD = range(6)
+_CHAR_CLASS = np.full(256, _BAD, dtype=np.uint8)
+_CHAR_CLASS[ord('0'):ord('9') + 1] = _DIGIT
+_CHAR_CLASS[ord(',')] = _COMMA
+_CHAR_CLASS[ord('\n')] = _NL
+_CHAR_CLASS[ord('-')] = _MINUS
+_CHAR_CLASS[[ord('\r'), ord(' '), ord('\t')]] = _SPACE
+
+
+class LabelParseError(ValueError):
+
+    def __init__(self, path, bad_lines):
+        self.path = path
+        self.bad_lines = bad_lines  # [(줄 번호, 원문), ...]
+        preview = ", ".join(str(n) for n, _ in bad_lines[:10])
+        more = " ..." if len(bad_lines) > 10 else ""
+        super().__init__(f"{path}: 잘못된 라벨 줄 {len(bad_lines)}개 (줄 번호: {preview}{more})")
+
+
+def parse_label_bytes(data, first_line=1):
+    # 바이트 → ((N, 7) int64 배열, [(줄 번호, 원문), ...] 잘못된 줄 목록)
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size and raw[-1] != ord('\n'):
+        raw = np.append(raw, np.uint8(ord('\n')))
+    if raw.size == 0:
+        return np.empty((0, NUM_FIELDS), dtype=np.int64), []
+
+    cls = _CHAR_CLASS[raw]
+    raw_nl = np.flatnonzero(cls == _NL)  # 줄 끝 위치
+
+    # 토큰 = 구분자(, 또는 \n) 사이 문자열, [tok_begin, tok_end) 는 앞뒤 공백을 뺀 내용 구간
+    is_sep = (cls == _COMMA) | (cls == _NL)
+    sep_pos = np.flatnonzero(is_sep)
+    sep_is_nl = cls[sep_pos] == _NL
+    n_tokens = len(sep_pos)
+    tok_begin = np.empty(n_tokens, dtype=np.int64)
+    tok_begin[0] = 0
+    tok_begin[1:] = sep_pos[:-1] + 1
+    tok_end = sep_pos
+    tok_bad = np.zeros(n_tokens, dtype=bool)
+    if (cls == _SPACE).any():
+        # 토큰별 공백이 아닌 문자의 처음 / 끝 위치, 그 사이에 공백이 끼어 있으면 잘못된 토큰
+        content = np.flatnonzero(~is_sep & (cls != _SPACE))
+        n_content = np.bincount(np.searchsorted(sep_pos, content), minlength=n_tokens)
+        has = np.flatnonzero(n_content)
+        last = np.cumsum(n_content)[has] - 1  # 토큰의 마지막 내용 문자 (content 기준)
+        tok_begin, tok_end = sep_pos.copy(), sep_pos.copy()  # 내용 없는 토큰은 길이 0
+        tok_begin[has] = content[last - n_content[has] + 1]
+        tok_end[has] = content[last] + 1
+        tok_bad = tok_end - tok_begin != n_content
+    tok_len = tok_end - tok_begin
+
+    # 토큰 맨 앞의 '-' 는 부호로 처리
+    tok_neg = np.zeros(n_tokens, dtype=bool)
+    tok_neg[tok_len > 0] = cls[tok_begin[tok_len > 0]] == _MINUS
+    digit_len = tok_len - tok_neg
+
+    # 토큰 유효성: 숫자가 1~MAX_DIGITS 자리, 허용되지 않는 문자 없음
+    tok_bad |= (digit_len <= 0) | (digit_len > MAX_DIGITS)
+    bad_pos = np.flatnonzero((cls == _BAD) | (cls == _MINUS))
+    if bad_pos.size:
+        bad_pos = bad_pos[~np.isin(bad_pos, tok_begin[tok_neg])]  # 부호 위치는 정상
+        tok_bad[np.searchsorted(sep_pos, bad_pos)] = True
+
+    # 각 토큰이 속한 줄 번호 (0부터), 줄별 토큰 수
+    tok_line = np.cumsum(sep_is_nl) - sep_is_nl
+    n_lines = len(raw_nl)
+    tokens_per_line = np.bincount(tok_line, minlength=n_lines)
+
+    # 줄 유효성: 빈 줄은 무시, 그 외에는 토큰 7개 모두 유효해야 함
+    blank_line = (tokens_per_line == 1) & (tok_len[sep_is_nl] == 0)
+    line_bad = np.bincount(tok_line, weights=tok_bad, minlength=n_lines) > 0
+    line_bad |= tokens_per_line != NUM_FIELDS
+    line_bad &= ~blank_line
+    tok_ok = ~(line_bad | blank_line)[tok_line]
+
+    # 숫자 변환: 유효 토큰의 끝자리부터 거꾸로 k번째 자리를 한꺼번에 모아 누적 (val = val * 10 + d)
+    end, length = tok_end[tok_ok], digit_len[tok_ok]
+    width = int(length.max()) if length.size else 0
+    values = np.zeros(len(end), dtype=np.int64)
+    for k in range(width, 0, -1):
+        digits = raw[np.maximum(end - k, 0)].astype(np.int64) - ord('0')
+        digits[length < k] = 0  # 자릿수가 k 보다 짧은 토큰
+        values = values * 10 + digits
+    values[tok_neg[tok_ok]] *= -1
+
+    # int32 범위를 벗어난 값이 있는 줄은 잘못된 줄로 (TrackStore 저장 시 값이 잘리지 않도록)
+    out = values.reshape(-1, NUM_FIELDS)
+    row_bad = ((out < INT32_MIN) | (out > INT32_MAX)).any(axis=1)
+    if row_bad.any():
+        line_bad[np.flatnonzero(~(line_bad | blank_line))[row_bad]] = True
+        out = out[~row_bad]
+
+    bad_lines = []
+    for line in np.flatnonzero(line_bad).tolist():
+        start = raw_nl[line - 1] + 1 if line > 0 else 0
+        text = bytes(raw[start:raw_nl[line]]).decode('utf-8', errors='replace').strip()
+        bad_lines.append((first_line + line, text))
+
+    return out, bad_lines
+
+
+def parse_label_file(path, strict=False):
+    # 라벨 파일 → (N, 7) int64 배열
+    # strict=True 이면 잘못된 줄이 있을 때 LabelParseError, 아니면 경고 출력 후 건너뜀
+    chunks, bad_lines = [], []
+    line_no = 1
+    carry = b''
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(CHUNK_BYTES)
+            if not block:
+                break
+            block = carry + block
+            cut = block.rfind(b'\n') + 1
+            if cut == 0:
+                carry = block
+                continue
+            carry = block[cut:]
+            values, bad = parse_label_bytes(block[:cut], first_line=line_no)
+            chunks.append(values)
+            bad_lines.extend(bad)
+            line_no += block.count(b'\n', 0, cut)
+    if carry:
+        values, bad = parse_label_bytes(carry, first_line=line_no)
+        chunks.append(values)
+        bad_lines.extend(bad)
+
+    if bad_lines:
+        if strict:
+            raise LabelParseError(path, bad_lines)
+        print(f"[WARN] {LabelParseError(path, bad_lines)} → 건너뜀")
+
+    if not chunks:
+        return np.empty((0, NUM_FIELDS), dtype=np.int64)
+    return np.concatenate(chunks)
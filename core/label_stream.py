@@ -0,0 +1,186 @@
+# 📁 label_stream.py
+# 장시간 녹화용 스트리밍 라벨 리더
+# - 파일 전체를 메모리에 올리지 않고 프레임 순서대로 필요한 부분만 읽음
+# - 메모리에는 최근 window_frames 개 프레임만 유지 (오래된 프레임부터 제거)
+# - index_stride 프레임마다 (프레임 → 바이트 오프셋) 을 기록해 두고, 탐색(seek) 시 그 위치부터 다시 읽음
+# - 라벨 파일은 트래커 출력처럼 프레임 번호 오름차순으로 기록되어 있다고 가정
+# - TrackStore 와 같은 dict 호환 인터페이스 (frame in reader, reader[frame], reader.get(frame, []))
+
+from bisect import bisect_right
+from collections import OrderedDict
+
+
+def _parse_line(line):
+    values = tuple(map(int, line.split(b',')))
+    return values[0], values[1:]
+
+
+def iter_label_frames(path):
+    # 파일 앞에서부터 (frame, [(obj_id, x1, y1, x2, y2, label), ...]) 를 순서대로 반환
+    # 한 번에 한 프레임 분량만 메모리에 유지
+    with open(path, 'rb') as f:
+        frame, objects = None, []
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            curr_frame, obj = _parse_line(line)
+            if curr_frame != frame and objects:
+                yield frame, objects
+                objects = []
+            frame = curr_frame
+            objects.append(obj)
+        if objects:
+            yield frame, objects
+
+
+class StreamingLabelReader:
+
+    def __init__(self, path, window_frames=600, index_stride=100):
+        self.path = path
+        self.window_frames = window_frames
+        self.index_stride = index_stride
+
+        self._f = open(path, 'rb')
+
+        # 희소 인덱스: 프레임 번호(오름차순) 와 그 프레임 첫 줄의 바이트 오프셋
+        self._index_frames = []
+        self._index_offsets = []
+
+        self._window = OrderedDict()  # frame → 객체 리스트 (최근 window_frames 개)
+        self._covered_from = 0        # 이 프레임부터 _last_frame 까지는 window 에 빠짐없이 있음
+        self._last_frame = None       # window 에 마지막으로 읽어 들인 프레임
+        self._carry = None            # 다음 프레임의 첫 줄 (frame, obj, offset)
+        self._eof = False
+
+        self._frontier = -1           # 지금까지 스캔한 최대 프레임
+        self._num_frames_seen = 0
+
+    # ── 파일 읽기 ──────────────────────────────────
+    def _read_line(self):
+        while True:
+            offset = self._f.tell()
+            line = self._f.readline()
+            if not line:
+                self._eof = True
+                return None
+            line = line.strip()
+            if not line:
+                continue
+            frame, obj = _parse_line(line)
+            return frame, obj, offset
+
+    def _read_next_frame(self):
+        first = self._carry if self._carry is not None else self._read_line()
+        self._carry = None
+        if first is None:
+            return None
+
+        frame, obj, offset = first
+        objects = [obj]
+        while True:
+            nxt = self._read_line()
+            if nxt is None:
+                break
+            if nxt[0] != frame:
+                self._carry = nxt
+                break
+            objects.append(nxt[1])
+
+        self._remember(frame, offset)
+        return frame, objects
+
+    def _remember(self, frame, offset):
+        # 처음 스캔하는 구간이면 희소 인덱스 갱신
+        if frame <= self._frontier:
+            return
+        self._frontier = frame
+        self._num_frames_seen += 1
+        if not self._index_frames or frame - self._index_frames[-1] >= self.index_stride:
+            self._index_frames.append(frame)
+            self._index_offsets.append(offset)
+
+    def _seek(self, frame):
+        # frame 이하에서 가장 가까운 인덱스 위치로 이동 (없으면 파일 처음)
+        i = bisect_right(self._index_frames, frame) - 1
+        if i >= 0:
+            offset, start = self._index_offsets[i], self._index_frames[i]
+        else:
+            offset, start = 0, 0
+
+        self._f.seek(offset)
+        self._window.clear()
+        self._covered_from = start
+        self._last_frame = None
+        self._carry = None
+        self._eof = False
+
+    def _read_until(self, frame):
+        while not self._at_end() and (self._last_frame is None or self._last_frame < frame):
+            item = self._read_next_frame()
+            if item is None:
+                break
+            curr_frame, objects = item
+            self._window[curr_frame] = objects
+            self._last_frame = curr_frame
+
+            # 메모리 상한: 오래된 프레임부터 제거
+            while len(self._window) > self.window_frames:
+                old_frame, _ = self._window.popitem(last=False)
+                self._covered_from = old_frame + 1
+
+    def _at_end(self):
+        return self._eof and self._carry is None
+
+    def _load(self, frame):
+        if frame < self._covered_from:
+            self._seek(frame)
+        elif self._last_frame is not None and frame <= self._last_frame:
+            return self._window.get(frame)
+        elif self._last_frame is not None and frame - self._last_frame > self.window_frames:
+            # 멀리 앞쪽으로 점프 → 인덱스가 있으면 그 위치부터 읽기
+            i = bisect_right(self._index_frames, frame) - 1
+            if i >= 0 and self._index_frames[i] > self._last_frame:
+                self._seek(frame)
+
+        self._read_until(frame)
+        return self._window.get(frame)
+
+    # ── dict 호환 인터페이스 ──────────────────────────
+    def __contains__(self, frame):
+        return self._load(frame) is not None
+
+    def __getitem__(self, frame):
+        objects = self._load(frame)
+        if objects is None:
+            raise KeyError(frame)
+        return objects
+
+    def get(self, frame, default=None):
+        objects = self._load(frame)
+        return default if objects is None else objects
+
+    def __len__(self):
+        # 지금까지 스캔한 (객체가 있는) 프레임 수
+        return self._num_frames_seen
+
+    def iter_frames(self, start_frame=0):
+        # start_frame 부터 순서대로 (frame, 객체 리스트) 반환 (window 상태를 공유하므로 단독으로 사용)
+        self._seek(start_frame)
+        while True:
+            item = self._read_next_frame()
+            if item is None:
+                return
+            if item[0] >= start_frame:
+                yield item
+
+    def close(self):
+        if not self._f.closed:
+            self._f.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
@@ -0,0 +1,81 @@
+# 📁 line_crossing.py
+# 선 통과 감지 일괄 계산
+# - 한 프레임의 모든 (이전 위치 → 현재 위치) 선분 × 모든 선을 NumPy 배열 연산 한 번으로 판정
+# - 판정식은 pyQT.py 의 crossed_line (ccw 4회, 엄격한 부등호) 과 완전히 동일
+# - 이미 통과한 (obj_id, line_id) 는 crossed_lines 로 중복 제외 (기존 루프와 같은 순서로 처리)
+# - 선 좌표는 QPoint 또는 (x, y) 모두 사용 가능
+# - 선이 많으면 spatial_index.GridIndex 로 이동 선분 주변 칸의 후보 선만 판정
+
+import numpy as np
+from spatial_index import GridIndex
+from utils import point_xy
+
+GRID_MIN_LINES = 8  # 선이 이 개수 이상이면 격자 인덱스로 후보만 판정
+
+
+def _ccw(xx, xy, yx, yy, zx, zy):
+    # crossed_line 의 ccw(X, Y, Z) 와 같은 식 (브로드캐스팅)
+    return (zy - xy) * (yx - xx) > (yy - xy) * (zx - xx)
+
+
+def segment_crossings(prev_pts, curr_pts, p1, p2):
+    # (S, 2) 이전 위치, (S, 2) 현재 위치, (L, 2) 선 시작점, (L, 2) 선 끝점 → (S, L) 통과 여부
+    prev_pts = np.asarray(prev_pts, dtype=np.int64).reshape(-1, 2)
+    curr_pts = np.asarray(curr_pts, dtype=np.int64).reshape(-1, 2)
+    p1 = np.asarray(p1, dtype=np.int64).reshape(-1, 2)
+    p2 = np.asarray(p2, dtype=np.int64).reshape(-1, 2)
+
+    ax, ay = prev_pts[:, 0:1], prev_pts[:, 1:2]   # (S, 1)
+    bx, by = curr_pts[:, 0:1], curr_pts[:, 1:2]
+    cx, cy = p1[:, 0], p1[:, 1]                    # (L,)
+    dx, dy = p2[:, 0], p2[:, 1]
+
+    return _crosses(ax, ay, bx, by, cx, cy, dx, dy)
+
+
+def _crosses(ax, ay, bx, by, cx, cy, dx, dy):
+    return ((_ccw(ax, ay, cx, cy, dx, dy) != _ccw(bx, by, cx, cy, dx, dy)) &
+            (_ccw(ax, ay, bx, by, cx, cy) != _ccw(ax, ay, bx, by, dx, dy)))
+
+
+def crossing_pairs(prev_pts, curr_pts, p1, p2, index=None):
+    # 통과한 (선분 번호, 선 번호) 쌍 (선분 → 선 순으로 정렬)
+    # index(GridIndex.from_segments(p1, p2)) 가 있으면 후보 쌍만 판정, 결과는 동일
+    if index is None:
+        return np.nonzero(segment_crossings(prev_pts, curr_pts, p1, p2))
+    a = np.asarray(prev_pts, dtype=np.int64).reshape(-1, 2)
+    b = np.asarray(curr_pts, dtype=np.int64).reshape(-1, 2)
+    seg, pos = index.candidates_for_segments(a, b)
+    c, d = p1[pos], p2[pos]
+    hit = _crosses(a[seg, 0], a[seg, 1], b[seg, 0], b[seg, 1], c[:, 0], c[:, 1], d[:, 0], d[:, 1])
+    return seg[hit], pos[hit]
+
+
+class LineCrossingEngine:
+
+    def __init__(self, lines=()):
+        self._lines = None
+        self.sync(lines)
+
+    def sync(self, lines):
+        # 선 목록 [(p1, p2, line_id, desc), ...] 이 바뀌었을 때만 좌표 배열 다시 생성
+        lines = list(lines)
+        if lines == self._lines:
+            return
+        self._lines = lines
+        self.p1 = np.array([point_xy(l[0]) for l in lines], dtype=np.int64).reshape(-1, 2)
+        self.p2 = np.array([point_xy(l[1]) for l in lines], dtype=np.int64).reshape(-1, 2)
+        self.line_ids = [l[2] for l in lines]
+        self.index = GridIndex.from_segments(self.p1, self.p2) if len(lines) >= GRID_MIN_LINES else None
+
+    def detect(self, obj_ids, prev_pts, curr_pts, crossed_lines):
+        # 새로 통과한 [(obj_id, line_id), ...] 반환 (객체 순서 → 선 순서), crossed_lines 에도 추가
+        if not self.line_ids or len(obj_ids) == 0:
+            return []
+        events = []
+        for s, l in zip(*crossing_pairs(prev_pts, curr_pts, self.p1, self.p2, self.index)):
+            key = (obj_ids[s], self.line_ids[l])
+            if key not in crossed_lines:
+                crossed_lines.add(key)
+                events.append(key)
+        return events
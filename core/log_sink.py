@@ -0,0 +1,97 @@
+# 📁 log_sink.py
+# 분석 결과 CSV 버퍼 기록기
+# - 기록할 줄은 메모리 버퍼에 쌓기만 함 (GUI 스레드는 디스크 I/O 없음)
+# - 파일은 처음 기록할 때 한 번만 열어 둠 (기록할 줄이 없으면 파일을 만들지 않음)
+# - 백그라운드 스레드가 flush_rows 줄이 쌓이거나 flush_interval_ms 가 지나면 한 번에 기록
+# - flush(): 지금까지 쌓인 줄이 디스크에 기록될 때까지 대기 (영상 전환 시)
+# - close(): 남은 줄 기록 후 스레드 종료, 파일 닫기 (closeEvent 에서)
+# - mode: 처음 열 때의 모드, "w" 이면 기존 내용을 지움 (헤더부터 새로 쓰는 경우), 기본은 이어 쓰기
+
+import os
+import time
+import threading
+
+DEFAULT_FLUSH_ROWS = 1000
+DEFAULT_FLUSH_INTERVAL_MS = 500
+
+
+class BufferedLogWriter:
+
+    def __init__(self, path, flush_rows=DEFAULT_FLUSH_ROWS, flush_interval_ms=DEFAULT_FLUSH_INTERVAL_MS, mode="a"):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._buf = []
+        self._written = 0    # 기록 요청된 줄 수
+        self._flushed = 0    # 디스크에 기록된 줄 수
+        self._closed = False
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._mode = mode
+        self._file = None    # 첫 기록 시 기록 스레드에서 열림
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, line):
+        # 줄 하나 추가 (줄바꿈 포함 문자열)
+        with self._cond:
+            if self._closed:
+                raise ValueError(f"닫힌 로그 파일에 기록할 수 없습니다: {self.path}")
+            self._buf.append(line)
+            self._written += 1
+            if len(self._buf) >= self.flush_rows:
+                self._cond.notify_all()
+
+    def write_row(self, values):
+        self.write(','.join(map(str, values)) + "\n")
+
+    def flush(self):
+        # 지금까지 추가된 줄이 모두 기록될 때까지 대기
+        with self._cond:
+            target = self._written
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._flushed < target and self._thread.is_alive():
+                self._cond.wait(0.1)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, self._mode, newline='', encoding='utf-8')
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # flush_rows 줄이 쌓이거나, flush_interval 이 지나거나, flush / close 요청이 올 때까지 대기
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._closed or self._flush_requested or len(self._buf) >= self.flush_rows):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                lines, self._buf = self._buf, []
+                self._flush_requested = False
+                closing = self._closed
+            if lines:
+                try:
+                    if self._file is None:
+                        self._open()
+                    self._file.write(''.join(lines))
+                    self._file.flush()
+                except OSError as e:
+                    print(f"[WARN] 로그 기록 실패 ({self.path}): {e}")
+            with self._cond:
+                self._flushed += len(lines)
+                self._cond.notify_all()
+                if closing and not self._buf:
+                    return
@@ -1,47 +1,27 @@
-import csv
+import os
 import json
 from datetime import datetime, timedelta
 import numpy as np
 import cv2
 from pyproj import Proj, Transformer
-
-# 실제 GPS 및 픽셀 좌표들
-gps_top_left = (37.40105982169699,127.11294216334416)
-gps_top_right = (37.40109597434296,127.11282504155552)
-gps_bottom_left = (37.40150924020716,127.11290613188024)
-gps_bottom_right = (37.40151269314831,127.1128284898534)
-
-px_top_left = (809,168)
-px_top_right = (990,195)
-px_bottom_left = (856,710)
-px_bottom_right = (1313,721)
-
-# UTM 변환기 초기화
-transformer_to_utm = Transformer.from_crs("EPSG:4326", "EPSG:5186", always_xy=True)
-transformer_to_gps = Transformer.from_crs("EPSG:5186", "EPSG:4326", always_xy=True)
-
-# GPS → UTM
-utm_top_left = transformer_to_utm.transform(gps_top_left[1], gps_top_left[0])
-utm_top_right = transformer_to_utm.transform(gps_top_right[1], gps_top_right[0])
-utm_bottom_left = transformer_to_utm.transform(gps_bottom_left[1], gps_bottom_left[0])
-utm_bottom_right = transformer_to_utm.transform(gps_bottom_right[1], gps_bottom_right[0])
-
-# Homography 매핑
-src_pts = np.array([px_top_left, px_top_right, px_bottom_right, px_bottom_left], dtype=np.float32)
-dst_pts = np.array([utm_top_left, utm_top_right, utm_bottom_right, utm_bottom_left], dtype=np.float32)
-H, _ = cv2.findHomography(src_pts, dst_pts)
+from geo import HomographyProjector, LocalTangentProjector, load_or_build_grid, make_local_projector
+from calibration import load_calibration
+from label_parser import parse_label_file
 
 FRAME_WIDTH = 1920
 FRAME_HEIGHT = 1080
 
+# 사전 계산 GPS 격자 사용 여부 (카메라별로 ./cache/geo 에 저장, 오차 허용치 초과 영역은 정확한 변환)
+USE_GPS_GRID = False
+GPS_GRID_STRIDE = 8
+GPS_GRID_TOL_M = 0.05
+
+# 투영 좌표 → lat/lon 을 기준점 주변 국소 근사식으로 계산 (검증 오차가 크면 자동으로 pyproj 사용)
+USE_LOCAL_PROJECTION = True
+
 def pixel_to_gps(x, y):
     # 반전 제거 - 영상 그대로 사용
-    pt = np.array([[x, y, 1]], dtype=np.float32).T
-    result = H @ pt
-    result /= result[2]
-    utm_x, utm_y = result[0][0], result[1][0]
-    lon, lat = transformer_to_gps.transform(utm_x, utm_y)
-    return lat, lon
+    return projector.pixel_to_gps(x, y)
 
 # 라벨 매핑
 label_map = {
@@ -57,40 +37,68 @@ label_map = {
 csv_path = "./assets/2024-10-21 08_16_26.63.txt"
 json_path = "output.json"
 
+# 라벨 파일이 있는 장소 폴더의 기준점(ref_coord.csv) 보정 사용 (./cache/calibration 에 저장)
+calib = load_calibration(os.path.dirname(csv_path))
+if calib is not None:
+    projector = calib.projector if USE_LOCAL_PROJECTION else calib.exact_projector
+else:
+    # 기준점 파일이 없으면 기존 4점 값으로 계산
+    gps_top_left = (37.40105982169699,127.11294216334416)
+    gps_top_right = (37.40109597434296,127.11282504155552)
+    gps_bottom_left = (37.40150924020716,127.11290613188024)
+    gps_bottom_right = (37.40151269314831,127.1128284898534)
+
+    px_top_left = (809,168)
+    px_top_right = (990,195)
+    px_bottom_left = (856,710)
+    px_bottom_right = (1313,721)
+
+    transformer_to_utm = Transformer.from_crs("EPSG:4326", "EPSG:5186", always_xy=True)
+    transformer_to_gps = Transformer.from_crs("EPSG:5186", "EPSG:4326", always_xy=True)
+
+    utm_pts = [transformer_to_utm.transform(lon, lat) for lat, lon in
+               (gps_top_left, gps_top_right, gps_bottom_right, gps_bottom_left)]
+    src_pts = np.array([px_top_left, px_top_right, px_bottom_right, px_bottom_left], dtype=np.float32)
+    dst_pts = np.array(utm_pts, dtype=np.float32)
+    H, _ = cv2.findHomography(src_pts, dst_pts)
+    projector = HomographyProjector(H, transformer_to_gps)
+    if USE_LOCAL_PROJECTION:
+        projector = make_local_projector(projector, np.mean(utm_pts, axis=0))
+
 base_time = datetime.strptime("2024-10-21T08:12:45Z", "%Y-%m-%dT%H:%M:%SZ")
 data_list = []
 
-with open(csv_path, newline='') as csvfile:
-    reader = csv.reader(csvfile)
-    for row in reader:
-        frame_num = int(row[0])
-        obj_id = int(row[1])
-        x1 = float(row[2])
-        y1 = float(row[3])
-        x2 = float(row[4])
-        y2 = float(row[5])
-        label_val = int(row[6])
-
-        # 바운딩 박스 중심 좌표
-        center_x = (x1 + x2) / 2
-        center_y = (y1 + y2) / 2
-
-        # 좌우/상하 반전 제거 후 바로 변환
-        lat, lon = pixel_to_gps(center_x, center_y)
-        altitude = 0
-        label = label_map.get(label_val, "unknown")
-
-        item = {
-            "frame": frame_num,
-            "id": obj_id,
-            "gps": {
-                "lat": center_x,
-                "lng": center_y
-            },
-            "altitude": altitude,
-            "label": label
-        }
-        data_list.append(item)
+rows = parse_label_file(csv_path)
+
+# 바운딩 박스 중심 좌표 (N, 2)
+centers = np.column_stack(((rows[:, 2] + rows[:, 4]) / 2, (rows[:, 3] + rows[:, 5]) / 2))
+
+if isinstance(projector, LocalTangentProjector):
+    print(f"국소 좌표 근사 사용: pyproj 대비 최대 편차 {projector.max_error_m * 1000:.3f} mm")
+
+# 좌우/상하 반전 제거 후 전체를 한 번에 변환 (호모그래피 행렬곱 1회 + pyproj 1회)
+if USE_GPS_GRID:
+    camera_key = os.path.basename(os.path.dirname(csv_path))
+    grid = load_or_build_grid(projector, camera_key, FRAME_WIDTH, FRAME_HEIGHT,
+                              GPS_GRID_STRIDE, GPS_GRID_TOL_M)
+    print(f"GPS 격자 사용: 최대 오차 {grid.max_error_m * 100:.1f} cm, 격자 적용 영역 {grid.valid.mean() * 100:.0f}%")
+    gps = grid.pixels_to_gps(centers)
+else:
+    gps = projector.pixels_to_gps(centers)
+altitude = 0
+
+for (frame_num, obj_id, _, _, _, _, label_val), (lat, lon) in zip(rows.tolist(), gps.tolist()):
+    item = {
+        "frame": frame_num,
+        "id": obj_id,
+        "gps": {
+            "lat": lat,
+            "lng": lon
+        },
+        "altitude": altitude,
+        "label": label_map.get(label_val, "unknown")
+    }
+    data_list.append(item)
 
 with open(json_path, "w") as f:
     json.dump(data_list, f, indent=2)
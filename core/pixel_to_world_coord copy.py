@@ -1,5 +1,6 @@
 import cv2
 import numpy as np
+from track_store import load_track_store
 
 # 라벨 색상 및 이름 정의
 LABEL_COLORS = {
@@ -80,18 +81,8 @@ def select_points_from_image(image):
 
 # 바운딩 박스 라벨 데이터 불러오기
 def read_raw_data(path):
-    frame_data = {}
-    with open(path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            values = list(map(int, line.split(',')))
-            frame, obj_id, x1, y1, x2, y2, label = values
-            if frame not in frame_data:
-                frame_data[frame] = []
-            frame_data[frame].append((obj_id, x1, y1, x2, y2, label))
-    return frame_data
+    # 프레임별 객체 목록을 TrackStore(NumPy 구조체 배열)로 반환
+    return load_track_store(path)
 
 # 전체 처리
 def process_video_with_perspective(video_path, label_path):
@@ -1,5 +1,6 @@
 import numpy as np
 import cv2
+from track_store import load_track_store
 
 LABEL_COLORS = {
     0: (0, 255, 0),      # Green
@@ -44,18 +45,8 @@ def pixel_to_gps(x, y):
     return (lat, lon)
 
 def read_raw_data(path):
-    frame_data = {}
-    with open(path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            values = list(map(int, line.split(',')))
-            frame, obj_id, x1, y1, x2, y2, label = values
-            if frame not in frame_data:
-                frame_data[frame] = []
-            frame_data[frame].append((obj_id, x1, y1, x2, y2, label))
-    return frame_data
+    # 프레임별 객체 목록을 TrackStore(NumPy 구조체 배열)로 반환
+    return load_track_store(path)
 
 
 def draw_polygon_with_mouse(event, x, y, flags, param):
@@ -8,6 +8,8 @@
 # 최종 수정일: 2025-07-08
 
 import sys, cv2, os, copy
+import multiprocessing
+import sqlite3
 import numpy as np
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel,
@@ -17,7 +19,26 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import QTimer, Qt, QPoint
 from PyQt5.QtGui import QImage, QPixmap, QKeyEvent, QPainter, QPen, QFont, QBrush, QColor
 from datetime import datetime
-from utils import point_in_polygon
+from utils import point_xy
+from label_cache import load_cached_track_store
+from label_stream import StreamingLabelReader
+from bulk_ingest import ingest_label_files
+from label_follow import LabelFollower
+from geo import linear_pixels_to_gps, box_centers
+from calibration import load_calibrations
+from line_crossing import LineCrossingEngine
+from zones import ZoneIndex, ZoneMask
+from dwell import DwellTracker, compute_dwell_intervals, dwell_seconds, write_dwell_csv
+from track_state import ObjectPairSet, TrackStateManager, forget_object
+from stationarity import StationarityDetector
+from log_sink import BufferedLogWriter
+from columnar_log import ColumnarLogWriter
+from sqlite_sink import SqliteResultSink, video_start_time, frame_time, EVENT_LINE_CROSS, EVENT_ILLEGAL_STOP
+from crossing_events import compute_crossing_events
+from track_store import TrackStore
+from keyframes import FrameSeeker
+from frame_cache import FrameCache, FramePrefetcher
+from decode_worker import DecodeWorker, END_OF_STREAM
 
 # 로그 폴더 없으면 생성
 if not os.path.exists("logs"):
@@ -36,6 +57,26 @@ LABEL_COLORS = {
 
 DEFAULT_COLOR = (200, 200, 200)
 
+# 이 크기 이상의 라벨 파일은 전체 로드 대신 스트리밍으로 읽음 (종일 녹화 등)
+STREAMING_LABEL_BYTES = 64 * 1024 * 1024
+
+# 불법 정차: 영역 안에서 이 시간(초) 이상 정지 상태가 이어지면 위반
+ILLEGAL_STOP_SECONDS = 8
+
+# 분석 결과를 CSV 와 함께 열 단위 바이너리(.npz)로도 저장 (columnar_log.py, read_columnar_log 로 로드)
+# 기본은 CSV 만 저장, 필요할 때 True
+SAVE_COLUMNAR_LOG = False
+
+# 분석 결과 / 이벤트를 누적 저장할 SQLite DB (sqlite_sink.py), None 이면 저장 안 함
+# 예) SQLITE_LOG_PATH = "./logs/analysis.sqlite"
+SQLITE_LOG_PATH = None
+
+# 디코딩된 프레임 캐시 크기(MB), 일시정지 중 현재 프레임 앞뒤로 미리 디코딩
+FRAME_CACHE_MB = 512
+
+# 영역 그리기: 첫 점에서 이 거리(픽셀, 맨해튼) 안을 클릭하면 다각형 완성
+AREA_CLOSE_DIST = 12
+
 LABEL_NAMES = {
     0: 'car',
     1: 'bus_s',
@@ -50,31 +91,32 @@ def get_location_folder_key(path):
     return os.path.basename(os.path.dirname(path))
 
 def read_raw_data(path, frame_offset=0):
-    frame_data = {}
-    with open(path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            values = list(map(int, line.split(',')))
-            frame, obj_id, x1, y1, x2, y2, label = values
-            # frame += frame_offset  # ✅ 누적 프레임 반영
-            if frame not in frame_data:
-                frame_data[frame] = []
-            frame_data[frame].append((obj_id, x1, y1, x2, y2, label))
-    return frame_data
+    # 프레임별 객체 목록을 TrackStore(NumPy 구조체 배열)로 반환
+    # 한 번 파싱한 라벨은 ./cache/labels 에 .npy 로 저장되어 다음부터는 mmap 으로 로드
+    # frame_data[frame] / frame_data.get(frame, []) / frame in frame_data 그대로 사용 가능
+    # frame += frame_offset  # ✅ 누적 프레임 반영
+    if os.path.getsize(path) >= STREAMING_LABEL_BYTES:
+        # 대용량 라벨: 필요한 구간만 읽는 스트리밍 리더 (같은 인터페이스)
+        return StreamingLabelReader(path)
+    return load_cached_track_store(path)
     
+# 2점 기준 선형 보간용 GPS / 픽셀 좌표
+GPS_REF1, GPS_REF2 = (37.401383, 127.112679), (37.401371, 127.113207)
+PX_REF1, PX_REF2 = (97, 415), (1342, 452)
+
 def pixel_to_gps(x, y):
-    gps1 = (37.401383, 127.112679)
-    gps2 = (37.401371, 127.113207)
-    px1 = (97, 415)
-    px2 = (1342, 452)
+    gps1, gps2 = GPS_REF1, GPS_REF2
+    px1, px2 = PX_REF1, PX_REF2
 
     ratio = (x - px1[0]) / (px2[0] - px1[0])
     lat = gps1[0] + ratio * (gps2[0] - gps1[0])
     lon = gps1[1] + ratio * (gps2[1] - gps1[1])
     return (lat, lon)
 
+def pixels_to_gps(points):
+    # (N, 2) 픽셀 → (N, 2) (lat, lon), pixel_to_gps 의 일괄 버전
+    return linear_pixels_to_gps(points, GPS_REF1, GPS_REF2, PX_REF1, PX_REF2)
+
 # 두 선분이 교차하는지 판단하는 함수 (ccw 알고리즘 사용)
 def crossed_line(p1, p2, prev_pt, curr_pt):
     # QPoint → 튜플로 변환
@@ -109,10 +151,14 @@ def draw_qt_transparent_polygon(painter, polygon, color=Qt.green, alpha=80):
 class VideoWindow(QWidget):
 
     # def __init__(self, video_path):
-    def __init__(self, video_label_pairs):
+    def __init__(self, video_label_pairs, label_ingest=None):
         super().__init__()
         self.setWindowTitle("TrafficTool")
         self.video_label_pairs = video_label_pairs  # 전체 쌍
+        self.label_ingest = label_ingest  # 미리 일괄 파싱된 라벨 (bulk_ingest)
+        self.follow_mode = False  # 기록 중인 라벨 파일 실시간 반영 여부
+        # 장소 폴더별 기준점(ref_coord.csv) 보정 → {장소 키: Calibration}, 없으면 2점 선형 보간 사용
+        self.calibrations = load_calibrations([v for v, _ in video_label_pairs])
         self.current_index = 0
 
         video_path, label_path = self.video_label_pairs[self.current_index]
@@ -127,6 +173,10 @@ class VideoWindow(QWidget):
         
         self.video_path = video_path
         self.cap = cv2.VideoCapture(self.video_path)
+        self.seeker = FrameSeeker.open(self.cap, self.video_path)  # 키프레임 인덱스 기반 이동
+        self.frame_cache = FrameCache(FRAME_CACHE_MB)
+        self.prefetcher = FramePrefetcher(self.frame_cache)
+        self.decoder = None  # 재생용 디코딩 스레드 (재생 시작 시 생성)
 
         # 영상 QLabel 크기 고정
         self.video_label = QLabel(self)
@@ -170,7 +220,7 @@ class VideoWindow(QWidget):
         # self.label_path = './assets/2024-10-21 08_56_19.337.txt' # 라벨 경로 수정
         # self.label_path = './assets/2024-10-21 13_13_50.136.txt'  # 라벨 경로 수정
         self.cumulative_frame_offset = 0  # 누적 프레임 오프셋
-        self.frame_data = read_raw_data(self.label_path)
+        self.frame_data = self.load_label_data(self.label_path)
         self.frame_idx = 1  # 프레임 번호 추적
 
         self.per_file_states = {}  # 각 영상별 상태 저장용 딕셔너리
@@ -231,6 +281,17 @@ class VideoWindow(QWidget):
 
         self.output_csv = csv_path
         self.csv_header_written = False
+        # 기록은 백그라운드 스레드에서 모아서 (GUI 스레드 디스크 I/O 제거)
+        # 파일은 첫 줄을 기록할 때 한 번만 열고 기존 내용은 지움 (기존 방식 "w"), 기록할 줄이 없으면 만들지 않음
+        self.log_writer = BufferedLogWriter(self.output_csv, mode="w")
+        self.columnar_log = (ColumnarLogWriter(os.path.splitext(self.output_csv)[0] + ".npz")
+                             if SAVE_COLUMNAR_LOG else None)
+        self.result_db = None
+        if SQLITE_LOG_PATH:
+            try:
+                self.result_db = SqliteResultSink(SQLITE_LOG_PATH)
+            except (sqlite3.Error, OSError) as e:
+                print(f"[WARN] SQLite DB 를 열 수 없음 (DB 저장 안 함): {e}")
 
 
         # ⏯ 영상 첫 프레임 미리 표시
@@ -239,7 +300,7 @@ class VideoWindow(QWidget):
         self.installEventFilter(self)
 
         # 선 통과 여부 저장용 딕셔너리 추가
-        self.cross_log = set()  # (obj_id, line_id) → 통과 여부
+        self.cross_log = ObjectPairSet()  # (obj_id, line_id) → 통과 여부 (obj_id 별 인덱스 포함)
 
         self.line_labels = {} # line_id → QLabel 매핑
 
@@ -255,16 +316,25 @@ class VideoWindow(QWidget):
         # 차량 정차 시간, 선 통과 이력 등 추적용 변수 초기화
         self.prev_positions = {}    # 각 객체의 이전 프레임 위치
         self.line_counts = {}       # 선별 카운트 저장 (몇 대가 통과했는지)
-        self.crossed_lines = set()  # 중복 통과 방지용 (obj_id, line_id)
+        self.crossed_lines = ObjectPairSet()  # 중복 통과 방지용 (obj_id, line_id)
+        self.line_engine = LineCrossingEngine()  # 선 통과 일괄 판정 (self.lines 와 자동 동기화)
+        self.crossing_events = None  # 영상 전체 선 통과 이벤트 표 (선 / 라벨이 바뀌면 다시 계산)
+        self.zone_index = None  # 영역 비트마스크 / 격자 인덱스 (영역이 바뀌면 다시 생성)
+        self._zone_key = None
+        self._crossing_key = None
+        self.crossing_table_key = None  # 이벤트 표를 사용 중인 재생 구간의 선 목록 키 (None: 프레임 단위 판정)
         self.illegal_log = set()    # 이미 불법정차로 기록된 차량 ID
-        self.stop_watch = {}        # 객체별 ROI 체류 시간 추적
+        self.stop_watch = DwellTracker(merge_zones=True)  # 객체별 ROI 체류 구간 추적 (전체 영역 기준)
+        self.dwell_exported = {}  # 영상 경로 → 체류 요약을 저장한 영역 목록 (같은 영역으로 중복 저장 방지)
+        self.track_states = TrackStateManager()  # 객체별 마지막 관측 프레임, 오래 안 보인 객체 상태 정리
+        self.stationary = StationarityDetector(self.fps)  # 객체별 최근 위치 링 버퍼 → 연속 정지 시간
 
 
         # 선 모드 / 영역 모드 전환
         self.draw_mode = 'line'  # 또는 'area'
         self.temp_points = []    # 클릭한 점들을 여기에 저장
 
-        self.stop_polygons = []  # → [ ([QPoint, QPoint, QPoint, QPoint], "설명"), ... ]
+        self.stop_polygons = []  # → [ ([QPoint, ...], "설명"), ... ] (꼭짓점 3개 이상)
 
         self.line_mode_button = QPushButton("선 만들기")
         self.area_mode_button = QPushButton("영역 만들기")
@@ -358,6 +428,16 @@ class VideoWindow(QWidget):
         frame_jump_layout.addWidget(self.search_frame_button)
         self.right_layout.addLayout(frame_jump_layout)
 
+        # 📡 라벨 실시간 반영 (트래커가 기록 중인 라벨 파일 따라가기)
+        self.follow_button = QPushButton("📡 라벨 실시간 반영")
+        self.follow_button.setCheckable(True)
+        self.follow_button.clicked.connect(self.toggle_follow_mode)
+        self.right_layout.addWidget(self.follow_button)
+
+        # 새로 추가된 바이트만 읽음 (파일 크기만 확인, 변화 없으면 아무것도 안 함)
+        self.follow_timer = QTimer()
+        self.follow_timer.timeout.connect(self.poll_label_file)
+
         self.force_draw_objects = False  # 👉 객체 박스 강제 그리기 용도
 
         self.group_states = {}  # 👉 폴더별(장소별) 상태 저장
@@ -378,6 +458,37 @@ class VideoWindow(QWidget):
             self.timer.start(30)
         else:
             self.is_paused = not self.is_paused
+        self.request_prefetch(self.frame_idx)
+
+    def request_prefetch(self, frame_idx):
+        # 멈춰 있으면 frame_idx 앞뒤 프레임 미리 디코딩, 재생 중이면 중단
+        if self.is_paused or self.drawing_enabled:
+            self.prefetcher.request(self.video_path, frame_idx, self.total_frames, self.seeker.keyframes)
+        else:
+            self.prefetcher.cancel()
+
+    def next_playback_frame(self):
+        # 디코딩 스레드가 미리 준비한 다음 프레임 꺼내기
+        # 스레드가 frame_idx 부터 재생 중이 아니면(처음 / 이동 / 영상 전환 후) 새로 시작
+        # → (프레임 번호, RGB 프레임), 준비 안 됨이면 None, 영상 끝이면 END_OF_STREAM
+        if (self.decoder is None or self.decoder.video_path != self.video_path or
+                self.decoder.next_frame != self.frame_idx):
+            self.stop_decoder()
+            self.decoder = DecodeWorker(self.video_path, self.frame_idx, self.seeker.keyframes)
+        return self.decoder.pop()
+
+    def stop_decoder(self):
+        if self.decoder is None:
+            return
+        self.decoder.stop()
+        stats = self.decoder.stats()
+        if stats['decoded']:
+            print(f"⏱ 디코딩 큐: {stats['decoded']}프레임, 최대 {stats['max_depth']}개 대기, underrun {stats['underruns']}회")
+        self.decoder = None
+
+    def decode_stats(self):
+        # 재생 디코딩 큐 상태 (모니터링용), 재생 전이면 None
+        return self.decoder.stats() if self.decoder is not None else None
 
     def go_prev_frame(self):
         if self.frame_idx <= 1:
@@ -416,6 +527,8 @@ class VideoWindow(QWidget):
         self.crossed_lines.clear()
         self.stop_watch.clear()
         self.prev_positions.clear()
+        self.track_states.clear()
+        self.stationary.clear()
         self.line_number = 1
         self.drawing_enabled = True
         self.draw_mode = 'line'
@@ -451,6 +564,14 @@ class VideoWindow(QWidget):
         self.timer.stop()
         
     def change_file(self, index):
+        # 이전 영상 결과를 디스크에 모두 기록한 뒤 전환
+        self.export_dwell_summary()
+        self.stop_decoder()
+        self.stop_crossing_table()
+        self.log_writer.flush()
+        if self.result_db is not None:
+            self.result_db.flush()
+
         print(f"📦 현재 영상: {self.video_path}")
         print(f"📄 매칭된 라벨: {self.label_path}")
         print(f"📊 라벨 데이터 프레임 수: {len(self.frame_data)}")  # 이게 0이면 라벨 없음
@@ -465,6 +586,8 @@ class VideoWindow(QWidget):
             "stop_watch": copy.deepcopy(self.stop_watch),
             "illegal_log": copy.deepcopy(self.illegal_log),
             "prev_positions": copy.deepcopy(self.prev_positions),
+            "track_states": copy.deepcopy(self.track_states),
+            "stationary": copy.deepcopy(self.stationary),
             "line_number": self.line_number,
             "area_number": self.area_number,
         }
@@ -489,7 +612,9 @@ class VideoWindow(QWidget):
 
         # 라벨 로딩 시 누적 프레임 오프셋 반영
         self.video_path, self.label_path = self.video_label_pairs[index]
-        self.frame_data = read_raw_data(self.label_path, frame_offset=self.cumulative_frame_offset)
+        if hasattr(self.frame_data, 'close'):
+            self.frame_data.close()  # 스트리밍 리더 파일 핸들 정리
+        self.frame_data = self.load_label_data(self.label_path)
 
         # ✅ 여기 아래에 영상 이름 라벨 갱신 추가!
         self.video_name_label.setText(f"🎬 현재 영상: {os.path.basename(self.video_path)}")
@@ -497,6 +622,7 @@ class VideoWindow(QWidget):
         # 영상 재로딩
         self.cap.release()
         self.cap = cv2.VideoCapture(self.video_path)
+        self.seeker = FrameSeeker.open(self.cap, self.video_path)
         # self.frame_data = read_raw_data(self.label_path)
         self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
         self.frame_slider.setMaximum(self.total_frames)
@@ -524,6 +650,8 @@ class VideoWindow(QWidget):
             self.stop_watch = state["stop_watch"]
             self.illegal_log = state["illegal_log"]
             self.prev_positions = state["prev_positions"]
+            self.track_states = state["track_states"]
+            self.stationary = state["stationary"]
             self.line_number = state["line_number"]
             self.area_number = state["area_number"]
         else:
@@ -531,10 +659,12 @@ class VideoWindow(QWidget):
             self.lines = []
             self.stop_polygons = []
             self.line_counts = {}
-            self.crossed_lines = set()
-            self.stop_watch = {}
+            self.crossed_lines = ObjectPairSet()
+            self.stop_watch = DwellTracker(merge_zones=True)
             self.illegal_log = set()
             self.prev_positions = {}
+            self.track_states = TrackStateManager()
+            self.stationary = StationarityDetector(self.fps)
             self.line_number = 1
             self.area_number = 1
 
@@ -617,6 +747,8 @@ class VideoWindow(QWidget):
         self.crossed_lines.clear()
         self.stop_watch.clear()
         self.illegal_log.clear()
+        self.track_states.clear()
+        self.stationary.clear()
 
         # self.lines.clear()
         # self.stop_polygons.clear()
@@ -632,10 +764,9 @@ class VideoWindow(QWidget):
         self.frame_slider.setValue(self.frame_idx)
         self.frame_label.setText(f"프레임: {self.frame_idx}")
 
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.frame_idx - 1)
-        ret, frame = self.cap.read()
+        frame = self.safe_seek(self.frame_idx)
 
-        if ret:
+        if frame is not None:
             self.frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             self.update_display_with_lines()
             self.frame_label.setText(f"프레임: {self.frame_idx}")
@@ -653,6 +784,172 @@ class VideoWindow(QWidget):
         self.drawing_enabled = True
         self.is_paused = True
 
+    def load_label_data(self, label_path):
+        # 실시간 반영 모드면 파일 끝을 따라가는 LabelFollower 사용
+        if self.follow_mode:
+            return LabelFollower(label_path)
+        # 일괄 파싱 결과가 있으면 그대로 사용, 없으면 개별 로드
+        if self.label_ingest is not None:
+            store = self.label_ingest.get(label_path)
+            if store is not None:
+                return store
+        return read_raw_data(label_path, frame_offset=self.cumulative_frame_offset)
+
+    def toggle_follow_mode(self):
+        self.follow_mode = self.follow_button.isChecked()
+        if hasattr(self.frame_data, 'close'):
+            self.frame_data.close()
+        self.frame_data = self.load_label_data(self.label_path)
+        if self.follow_mode:
+            print(f"📡 라벨 실시간 반영 시작: {self.label_path}")
+            self.follow_timer.start(500)
+        else:
+            print("📡 라벨 실시간 반영 종료")
+            self.follow_timer.stop()
+
+    def poll_label_file(self):
+        if isinstance(self.frame_data, LabelFollower):
+            added = self.frame_data.poll()
+            if added:
+                print(f"📡 라벨 {added}행 추가 (총 {len(self.frame_data)} 프레임)")
+
+    def export_dwell_summary(self):
+        # 현재 영상 전체의 영역 체류 구간을 라벨 배열에서 한 번에 계산해 ..._dwell.csv 에 저장 (영역별)
+        # 전체 배열이 없는 스트리밍 라벨이거나 영역이 없으면 생략
+        if not isinstance(self.frame_data, TrackStore) or not self.stop_polygons:
+            return
+        key = [[point_xy(p) for p in polygon] for polygon, _ in self.stop_polygons]
+        if self.dwell_exported.get(self.video_path) == key:
+            return
+        intervals = compute_dwell_intervals(self.frame_data, ZoneIndex(key), 1, self.total_frames)
+        dwell_path = os.path.splitext(self.output_csv)[0] + "_dwell.csv"
+        try:
+            write_dwell_csv(dwell_path, os.path.basename(self.video_path), intervals, self.fps)
+        except OSError as e:
+            print(f"[WARN] 체류 요약 저장 실패 ({dwell_path}): {e}")
+            return
+        self.dwell_exported[self.video_path] = key
+        if len(intervals):
+            longest = float(dwell_seconds(intervals, self.fps).max())
+            print(f"⏱ 영역 체류 {len(intervals)}건 저장 (최장 {longest:.1f}초): {dwell_path}")
+
+    def record_event(self, event_type, obj_id, line_id=None, label=None, seconds=None):
+        # 현재 프레임의 이벤트를 결과 DB 에 기록 (장소 = 영상 폴더명, 시각 = 파일명의 녹화 시작 시각 + 프레임)
+        if self.result_db is None:
+            return
+        time = frame_time(video_start_time(self.video_path), self.frame_idx, self.fps)
+        self.result_db.add_event(os.path.basename(self.video_path), get_location_folder_key(self.video_path),
+                                 self.frame_idx, time, obj_id, event_type,
+                                 line_id=line_id, label=label, seconds=seconds)
+
+    def frame_pixels_to_gps(self, points):
+        # 현재 영상 장소의 보정(호모그래피)이 있으면 사용, 없으면 기존 2점 선형 보간
+        calib = self.calibrations.get(get_location_folder_key(self.video_path))
+        if calib is not None:
+            return calib.pixels_to_gps(points)
+        return pixels_to_gps(points)
+
+    def detect_line_crossings(self, frame_objects, centers):
+        # 이전 위치가 있는 객체의 (이전 → 현재) 선분을 모아 LineCrossingEngine 으로 일괄 판정
+        # 결과는 기존 crossed_line 루프와 동일 (같은 순서, crossed_lines 로 중복 제외)
+        obj_ids, prev_pts, curr_pts = [], [], []
+        for obj, (cx, cy) in zip(frame_objects, centers):
+            obj_id = obj[0]
+            prev_point = self.prev_positions.get(obj_id)
+            if prev_point is not None:
+                obj_ids.append(obj_id)
+                prev_pts.append((prev_point.x(), prev_point.y()))
+                curr_pts.append((cx, cy))
+            # 현재 위치 저장
+            self.prev_positions[obj_id] = QPoint(cx, cy)
+
+        self.line_engine.sync(self.lines)
+        for obj_id, num in self.line_engine.detect(obj_ids, prev_pts, curr_pts, self.crossed_lines):
+            self.line_counts[num] = self.line_counts.get(num, 0) + 1
+            print(f"🚗 차량 {obj_id} 선 {num} 통과 (총 {self.line_counts[num]}회)")
+
+            # 선 통과 기록
+            self.cross_log.add((obj_id, num))
+            self.record_event(EVENT_LINE_CROSS, obj_id, line_id=num)
+
+    def update_line_crossings(self, frame_objects, centers):
+        # 선 통과 감지: 이벤트 표를 쓸 수 있으면 조회, 아니면 프레임 단위 일괄 판정
+        events = self.crossing_table_events(frame_objects)
+        if events is None:
+            self.detect_line_crossings(frame_objects, centers)
+            return
+        self.apply_crossing_events(events)
+        # 표 사용 중에도 이전 위치는 갱신 (이후 프레임 단위 판정으로 넘어갈 때 사용)
+        for obj, (cx, cy) in zip(frame_objects, centers):
+            self.prev_positions[obj[0]] = QPoint(cx, cy)
+
+    def start_crossing_table(self):
+        # 1번 프레임부터 재생을 시작할 때 호출: 이 재생 구간 동안 이벤트 표 사용
+        events = self.refresh_crossing_events()
+        fresh = not self.crossed_lines and not self.prev_positions
+        self.crossing_table_key = self._crossing_key if events is not None and fresh else None
+
+    def stop_crossing_table(self):
+        # 이동 / 영상 전환 / 선 변경 / 통과 객체 정리 후에는 표와 프레임 단위 판정 결과가 달라질 수 있음
+        self.crossing_table_key = None
+
+    def crossing_table_events(self, frame_objects):
+        # 이벤트 표(객체 · 선별 첫 통과만)는 "1번 프레임부터 끊김 없이 재생, 선 변경 없음" 일 때만
+        # 프레임 단위 판정과 결과가 같음 → 그 조건에서만 현재 프레임 이벤트 반환, 아니면 None
+        if self.crossing_table_key is None:
+            return None
+        self.refresh_crossing_events()
+        if self._crossing_key != self.crossing_table_key:
+            self.stop_crossing_table()  # 재생 중 선 추가 / 삭제 / 이동
+            return None
+        events = self.crossing_events.at_frame(self.frame_idx)
+        # 이전 위치가 정리된 객체(오래 안 보였던 객체)의 이벤트는 프레임 단위 판정이라면 나오지 않음
+        if any(obj_id not in self.prev_positions for obj_id in events['obj_id'].tolist()):
+            self.stop_crossing_table()
+            return None
+        return events
+
+    def refresh_crossing_events(self):
+        # 라벨 전체 + 현재 선 목록으로 영상 전체의 선 통과 이벤트 표 계산 (선 / 라벨 / 영상이 바뀔 때만)
+        # 전체 배열이 없는 스트리밍 라벨이면 None
+        if not isinstance(self.frame_data, TrackStore) or not self.lines:
+            self.crossing_events = None
+            return None
+        key = (self.frame_data, self.frame_data.num_rows, self.total_frames,
+               [(point_xy(p1), point_xy(p2), num) for p1, p2, num, _ in self.lines])
+        if key != self._crossing_key:
+            self.crossing_events = compute_crossing_events(self.frame_data, self.lines, 1, self.total_frames)
+            self._crossing_key = key
+            print(f"📊 선 통과 이벤트 {len(self.crossing_events)}건 계산 (영상 전체: {self.crossing_events.counts})")
+        return self.crossing_events
+
+    def refresh_zone_index(self):
+        # 영역 목록(또는 프레임 크기)이 바뀌었을 때만 다시 생성
+        # 영역이 ZoneMask.MAX_ZONES 개 이하면 프레임 크기 비트마스크, 넘으면 격자 인덱스
+        polygons = [[point_xy(p) for p in polygon] for polygon, _ in self.stop_polygons]
+        height, width = self.frame.shape[:2]
+        key = (polygons, width, height)
+        if self.zone_index is None or key != self._zone_key:
+            if len(polygons) <= ZoneMask.MAX_ZONES:
+                self.zone_index = ZoneMask(polygons, width, height)
+            else:
+                self.zone_index = ZoneIndex(polygons)
+            self._zone_key = key
+        return self.zone_index
+
+    def apply_crossing_events(self, frame_events):
+        # 현재 프레임의 이벤트를 기존 카운트 / 중복 제외 / 기록에 반영
+        for obj_id, num in frame_events[['obj_id', 'line_id']].tolist():
+            if (obj_id, num) in self.crossed_lines:
+                continue
+            self.crossed_lines.add((obj_id, num))
+            self.line_counts[num] = self.line_counts.get(num, 0) + 1
+            print(f"🚗 차량 {obj_id} 선 {num} 통과 (총 {self.line_counts[num]}회)")
+
+            # 선 통과 기록
+            self.cross_log.add((obj_id, num))
+            self.record_event(EVENT_LINE_CROSS, obj_id, line_id=num)
+
     def get_line_description(self, line_id):
         for p1, p2, num, desc in self.lines:
             if num == line_id:
@@ -660,21 +957,15 @@ class VideoWindow(QWidget):
         return ""
     
     def safe_seek(self, target_frame):
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        for i in range(target_frame - 1):
-            ret, _ = self.cap.read()
-            if not ret:
-                print(f"[ERROR] Frame {i+1} read failed during seek")
-
-        ret, frame = self.cap.read()
-        if not ret:
-            print(f"[ERROR] Frame {target_frame} read failed at target")
-            return None
-
+        self.stop_crossing_table()  # 건너뛴 구간의 통과는 프레임 단위 판정으로만 반영 가능
+        # 캐시에 있으면 디코딩 없이 반환, 없으면 목표 이전 키프레임부터 목표까지만 디코딩 (keyframes.py)
+        frame = self.frame_cache.get(self.video_path, target_frame)
         if frame is None:
-            print(f"[ERROR] Frame {target_frame} is None")
-            return None
-
+            frame = self.seeker.seek(target_frame)
+            if frame is None:
+                return None
+            self.frame_cache.put(self.video_path, target_frame, frame)
+        self.request_prefetch(target_frame)
         return frame.copy()  # ✅ 반드시 frame 반환해야 정상 동작
     
     def jump_to_frame(self):
@@ -702,14 +993,24 @@ class VideoWindow(QWidget):
 
     def inside_for_last_n_frames(self, obj_id, n=10):
     # """객체가 최근 n프레임 이상 ROI 내에 있었는지"""
-        if obj_id in self.stop_watch:
-            start = self.stop_watch[obj_id]['start']
-            end = self.stop_watch[obj_id]['end']
-            return (end - start) >= n
+        interval = self.stop_watch.current(obj_id)
+        if interval is not None:
+            return interval.span_frames >= n
         return False
 
     def recently_crossed_line(self, obj_id):
-        return any(obj == obj_id for obj, _ in self.cross_log)
+        return self.cross_log.has_object(obj_id)
+
+    def evict_stale_tracks(self, obj_ids):
+        # 현재 프레임 객체의 관측 프레임 갱신 후, 오래 안 보인 객체의 상태를 모두 정리
+        self.track_states.touch(self.frame_idx, obj_ids)
+        for obj_id in self.track_states.evict(self.frame_idx):
+            if self.crossed_lines.has_object(obj_id):
+                # 통과 기록이 지워진 객체는 다시 통과할 수 있으나 이벤트 표에는 첫 통과만 있음
+                self.stop_crossing_table()
+            for container in (self.prev_positions, self.stop_watch, self.stationary,
+                              self.crossed_lines, self.cross_log, self.illegal_log):
+                forget_object(container, obj_id)
 
     def is_within_violation_time(self, now):
         # """단속 시간대 여부 (08:00~20:00)"""
@@ -750,31 +1051,59 @@ class VideoWindow(QWidget):
         if (self.is_paused or self.drawing_enabled) and not self.force_draw_objects:
             return 
         
-        # 다음 프레임 읽기
-        ret, frame = self.cap.read()
-
-        if not ret:
-            print("⚠️ 프레임 읽기 실패 → 다음 영상으로 전환 시도")
-
-            if self.current_index + 1 < len(self.video_label_pairs):
-                self.current_index += 1
-                self.change_file(self.current_index)
-                self.drawing_enabled = False
-                self.is_paused = False
-                self.timer.start(30)
-            else:
-                print("✅ 모든 영상 재생 완료")
-                self.timer.stop()
+        if self.force_draw_objects:
+            # 이동 직후 다시 그리기: 호출 측에서 설정한 현재 프레임 사용 (디코더 사용 안 함)
+            frame_rgb = self.frame.copy()
+        else:
+            self.prefetcher.cancel()
+
+            # 다음 프레임 꺼내기 (디코딩 / RGB 변환은 백그라운드 스레드에서)
+            item = self.next_playback_frame()
+            if item is None:
+                return  # 아직 디코딩 안 됨 → 다음 타이머에서 다시
+
+            if item is END_OF_STREAM:
+                print("⚠️ 프레임 읽기 실패 → 다음 영상으로 전환 시도")
+
+                if self.current_index + 1 < len(self.video_label_pairs):
+                    self.current_index += 1
+                    self.change_file(self.current_index)
+                    self.drawing_enabled = False
+                    self.is_paused = False
+                    self.timer.start(30)
+                else:
+                    print("✅ 모든 영상 재생 완료")
+                    self.timer.stop()
 
-            return
-        # BGR → RGB 변환
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                return
+            _, frame_rgb = item
+            if self.frame_idx == 1:
+                self.start_crossing_table()
 
         self.frame = frame_rgb  # 💥 반드시 먼저 설정
        
         if self.frame_idx in self.frame_data:
+            frame_objects = self.frame_data[self.frame_idx]
+
+            # 현재 프레임 전체 객체의 GPS 좌표를 한 번에 계산
+            boxes = np.array([obj[1:5] for obj in frame_objects])
+            centers = box_centers(boxes)
+            frame_gps = self.frame_pixels_to_gps(centers).tolist()
+
+            # 영역 포함 여부: 프레임 전체 객체 × 전체 영역 (비트마스크 조회, 정지 감지 / CSV 공용)
+            zone_inside = self.refresh_zone_index().membership(centers)
+
+            # 객체 수명 관리: 오래 안 보인 객체 상태 정리
+            self.evict_stale_tracks([obj[0] for obj in frame_objects])
+
+            # 영역 체류 구간 갱신 (inside_for_last_n_frames 에서 사용)
+            self.stop_watch.update(self.frame_idx, [obj[0] for obj in frame_objects], zone_inside, centers.tolist())
+
+            # 선 통과 감지: 처음부터 끊김 없이 재생 중이면 미리 계산한 이벤트 표 조회, 아니면 프레임 단위 일괄 판정
+            self.update_line_crossings(frame_objects, centers.tolist())
+
             # 현재 프레임의 객체 정보 처리
-            for obj_id, x1, y1, x2, y2, label in self.frame_data[self.frame_idx]:
+            for i, (obj_id, x1, y1, x2, y2, label) in enumerate(frame_objects):
                 color = LABEL_COLORS.get(label, DEFAULT_COLOR)
                 label_name = LABEL_NAMES.get(label, f"Label:{label}")
 
@@ -789,29 +1118,11 @@ class VideoWindow(QWidget):
                 cv2.circle(frame_rgb, (cx, cy), 3, color, -1)
 
                 # GPS 좌표 표시
-                lat, lon = pixel_to_gps(cx, cy)
+                lat, lon = frame_gps[i]
                 cv2.putText(frame_rgb, f"({lat:.6f}, {lon:.6f})", (cx + 5, cy + 15),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
 
                 # cx, cy = int((x1 + x2) / 2), int((y1 + y2) / 2)
-                curr_point = QPoint(cx, cy)
-
-
-                # 선 통과 감지: 이전 위치와 현재 위치가 선을 가로질렀는지 확인 / 통과한 선은 crossed_lines에 추가
-                if obj_id in self.prev_positions:
-                    prev_point = self.prev_positions[obj_id]
-                    for p1, p2, num, _ in self.lines:
-                        if (obj_id, num) not in self.crossed_lines:
-                            if crossed_line(p1, p2, prev_point, curr_point):
-                                self.crossed_lines.add((obj_id, num))
-                                self.line_counts[num] = self.line_counts.get(num, 0) + 1
-                                print(f"🚗 차량 {obj_id} 선 {num} 통과 (총 {self.line_counts[num]}회)")
-
-                                # 선 통과 기록
-                                self.cross_log.add((obj_id, num))
-
-                # 현재 위치 저장
-                self.prev_positions[obj_id] = curr_point
 
             # if hasattr(self, 'stop_polygons'):
             #     # 각 ROI를 반투명으로 채움
@@ -819,51 +1130,33 @@ class VideoWindow(QWidget):
             #         if len(polygon) == 4:
             #             draw_transparent_polygon(frame_rgb, polygon, color=(0, 128, 0), alpha=0.25)                
 
-                # 정지 감지 및 불법주정차 판단:
-                for polygon in self.stop_polygons:
-
-                    if len(polygon) == 4 and point_in_polygon((cx, cy), polygon):
-                        # 현재 객체가 정지 감지 영역에 있는 경우
-                        self.stop_watch.setdefault(obj_id, {'start': self.frame_idx, 'end': self.frame_idx, 'prev_pos': curr_point})
-                        self.stop_watch[obj_id]['end'] = self.frame_idx
-                        self.stop_watch[obj_id]['prev_pos'] = curr_point
-                        break
+                # 정지 감지 및 불법주정차 판단: 영역 안에서 정지 상태가 이어진 시간으로 바로 판단
+                # 불법 주정차로 감지된 차량은 콘솔 출력, 영상 위 경고 텍스트 표시, csv 파일에 로그 기록
+                if zone_inside[i].any():
+                    seconds = self.stationary.update(obj_id, self.frame_idx, cx, cy)
+                    if (
+                        seconds >= ILLEGAL_STOP_SECONDS and
+                        obj_id not in self.illegal_log and
+                        self.inside_for_last_n_frames(obj_id, 10) and
+                        not self.recently_crossed_line(obj_id) and
+                        self.is_within_violation_time(datetime.now()) and
+                        self.is_illegal_vehicle_type(label)
+                    ):
+                        print(f"🚨 차량 {obj_id} ROI 내 불법정차 {seconds:.1f}초")
+                        cv2.putText(frame_rgb, f"🚨 정차 차량 {obj_id}", (x1, y1 - 30),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+                        self.illegal_log.add(obj_id)
+                        self.log_writer.write(f"{self.frame_idx},{obj_id},{label_name},{x1},{y1},{x2},{y2},{round(seconds,1)}\n")
+                        self.record_event(EVENT_ILLEGAL_STOP, obj_id, label=label, seconds=round(seconds, 1))
                 else:
-                    if obj_id in self.stop_watch:
-                        # ROI 벗어난 경우 총 체류시간 계산
-                        start = self.stop_watch[obj_id]['start']
-                        end = self.stop_watch[obj_id]['end']
-                        seconds = (end - start) / self.fps
-                       
-                        prev_point = self.stop_watch[obj_id].get('prev_pos', curr_point)
-                        move_dist = (curr_point - prev_point).manhattanLength()
-
-                        # 불법 정차 감지: 5초 이상 정지 + 이동 거리 10픽셀 이하
-                        # 불법 주정차로 감지된 차량은 콘솔 출력, 영상 위 경고 텍스트 표시, csv 파일에 로그 기록
-                        now = datetime.now()
-                        if (
-                            seconds >= 8 and
-                            move_dist < 10 and
-                            self.inside_for_last_n_frames(obj_id, 10) and
-                            not self.recently_crossed_line(obj_id) and
-                            self.is_within_violation_time(now) and
-                            self.is_illegal_vehicle_type(label)
-                        ):
-                            if obj_id not in self.illegal_log:
-                                print(f"🚨 차량 {obj_id} ROI 내 불법정차 {seconds:.1f}초")
-                                cv2.putText(frame_rgb, f"🚨 정차 차량 {obj_id}", (x1, y1 - 30),
-                                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                                self.illegal_log.add(obj_id)
-                                with open(self.output_csv, "a", newline='') as f:
-                                    f.write(f"{self.frame_idx},{obj_id},{label_name},{x1},{y1},{x2},{y2},{round(seconds,1)}\n")
-
-                        del self.stop_watch[obj_id]
+                    # 영역 밖: 정지 이력 초기화
+                    self.stationary.discard_object(obj_id)
 
             # 프레임 저장 및 표시 갱신
             self.frame = frame_rgb
 
             # 현재 프레임 객체들의 선 통과 여부 기록
-            for obj in self.frame_data.get(self.frame_idx, []):
+            for row_idx, obj in enumerate(frame_objects):
                 obj_id, x1, y1, x2, y2, label = obj
                 # real_frame = self.cumulative_frame_offset + self.frame_idx
                 base_info = [self.frame_idx, obj_id, x1, y1, x2, y2, label] # LABEL_NAMES.get(label, label): 라벨명 그대로 출력
@@ -874,17 +1167,8 @@ class VideoWindow(QWidget):
                     state = 1 if (obj_id, i) in self.cross_log else 0
                     line_states.append(state)
 
-                # 중심 좌표
-                cx, cy = int((x1 + x2) / 2), int((y1 + y2) / 2)
-
-                # 영역 포함 여부
-                area_states = []
-                for polygon in self.stop_polygons:
-                    if len(polygon) == 4:
-                        inside = point_in_polygon((cx, cy), polygon)
-                        area_states.append(1 if inside else 0)
-                    else:
-                        area_states.append(0)
+                # 영역 포함 여부 (위에서 계산한 결과 재사용)
+                area_states = zone_inside[row_idx].astype(int).tolist()
 
                 # ⏬ CSV 헤더는 1번만 작성
                 # if not self.csv_header_written:
@@ -906,19 +1190,21 @@ class VideoWindow(QWidget):
                 self.global_max_area_number = max(self.global_max_area_number, self.max_area_number)
 
                 if not self.csv_header_written:
-                    with open(self.output_csv, "w") as f:
-                        base = "video,frame,obj_id,x1,y1,x2,y2,label"
-                        for i in range(1, self.global_max_line_number + 1):
-                            base += f",line_{i}"
-                        for j in range(1, self.global_max_area_number + 1):
-                            base += f",area_{j}"
-                        f.write(base + "\n")
+                    base = "video,frame,obj_id,x1,y1,x2,y2,label"
+                    for i in range(1, self.global_max_line_number + 1):
+                        base += f",line_{i}"
+                    for j in range(1, self.global_max_area_number + 1):
+                        base += f",area_{j}"
+                    self.log_writer.write(base + "\n")
                     self.csv_header_written = True
 
-                with open(self.output_csv, "a", newline='') as f:
-                    video_name = os.path.basename(self.video_path)
-                    row = [video_name] + base_info + line_states + area_states
-                    f.write(','.join(map(str, row)) + "\n")
+                video_name = os.path.basename(self.video_path)
+                row = [video_name] + base_info + line_states + area_states
+                self.log_writer.write_row(row)
+                if self.columnar_log is not None:
+                    self.columnar_log.append(video_name, *base_info, line_states, area_states)
+                if self.result_db is not None:
+                    self.result_db.add_detection(video_name, *base_info, line_states, area_states)
 
             # # ✅ 선 통과 카운트 라벨 갱신
             for line_id, label in self.line_labels.items():
@@ -994,7 +1280,7 @@ class VideoWindow(QWidget):
         # 영역(사각형) 그리기 + 반투명 채우기 + 설명 표시
         if hasattr(self, 'stop_polygons'):
             for i, (polygon, desc) in enumerate(self.stop_polygons):
-                if len(polygon) == 4:
+                if len(polygon) >= 3:
                     # ✅ 1) 반투명 채우기 먼저
                     draw_qt_transparent_polygon(painter, polygon, Qt.green, alpha=80)
 
@@ -1006,8 +1292,8 @@ class VideoWindow(QWidget):
                         painter.drawEllipse(pt, 4, 4)
 
                     # ✅ 3) 텍스트 표시
-                    cx = sum([pt.x() for pt in polygon]) // 4
-                    cy = sum([pt.y() for pt in polygon]) // 4
+                    cx = sum([pt.x() for pt in polygon]) // len(polygon)
+                    cy = sum([pt.y() for pt in polygon]) // len(polygon)
                     painter.drawText(cx + 5, cy - 5, f"{i+1}. {desc}")
 
 
@@ -1025,7 +1311,12 @@ class VideoWindow(QWidget):
         ))
 
     def handle_mouse_press(self, event):
-        if self.drawing_enabled and event.button() == Qt.LeftButton:
+        close_area = False
+        if self.drawing_enabled and event.button() == Qt.RightButton:
+            # 영역 모드: 오른쪽 클릭으로 다각형 완성 (꼭짓점 3개 이상)
+            close_area = self.draw_mode == 'area' and len(self.temp_points) >= 3
+
+        if self.drawing_enabled and (event.button() == Qt.LeftButton or close_area):
             # 클릭 위치 (video_label 기준 좌표)
             label_pos = event.pos()
 
@@ -1042,7 +1333,12 @@ class VideoWindow(QWidget):
             corrected_y = int(label_pos.y() * scale_y)
             corrected_point = QPoint(corrected_x, corrected_y)
 
-            self.temp_points.append(corrected_point)
+            # 영역 모드: 첫 점 근처를 다시 클릭해도 다각형 완성
+            if (not close_area and self.draw_mode == 'area' and len(self.temp_points) >= 3 and
+                    (corrected_point - self.temp_points[0]).manhattanLength() <= AREA_CLOSE_DIST):
+                close_area = True
+            if not close_area:
+                self.temp_points.append(corrected_point)
 
             # 선 모드일 경우: 점 2개 찍으면 하나의 선 생성
             if self.draw_mode == 'line' and len(self.temp_points) == 2:
@@ -1102,8 +1398,8 @@ class VideoWindow(QWidget):
                 self.temp_points.clear()
                 self.update_display_with_lines()
 
-            # 영역 모드일 경우: 점 4개 찍으면 사각형 ROI 생성
-            elif self.draw_mode == 'area' and len(self.temp_points) == 4:
+            # 영역 모드일 경우: 첫 점 근처 클릭 또는 오른쪽 클릭으로 다각형 ROI 생성 (꼭짓점 수 제한 없음)
+            elif self.draw_mode == 'area' and close_area:
                 polygon = self.temp_points.copy()
 
                 # ✨ 설명 입력 받기
@@ -1307,7 +1603,21 @@ class VideoWindow(QWidget):
             self.force_draw_objects = False
 
     def closeEvent(self, event):
+        self.export_dwell_summary()
+        self.log_writer.close()  # 남은 결과 기록 후 파일 닫기
+        if self.columnar_log is not None:
+            self.columnar_log.close()
+        if self.result_db is not None:
+            self.result_db.close()
+        self.prefetcher.close()
+        self.stop_decoder()
         self.cap.release()
+        self.follow_timer.stop()
+        if hasattr(self.frame_data, 'close'):
+            self.frame_data.close()
+        self.frame_data = None
+        if self.label_ingest is not None:
+            self.label_ingest.close()  # 공유 메모리 해제
         event.accept()
 
 # if __name__ == '__main__':
@@ -1319,6 +1629,7 @@ class VideoWindow(QWidget):
 #     sys.exit(app.exec_())
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # PyInstaller exe 에서 프로세스 풀 사용
     app = QApplication(sys.argv)
 
     # ✅ 영상 파일 선택
@@ -1355,7 +1666,12 @@ if __name__ == '__main__':
         QMessageBox.warning(None, "경고", "매칭되는 영상-라벨 쌍이 없습니다.")
         sys.exit()
 
+    # ✅ 선택된 라벨 파일 일괄 파싱 (프로세스 풀, 대용량 파일은 스트리밍으로 따로 처리)
+    bulk_paths = [l for _, l in video_label_pairs if os.path.getsize(l) < STREAMING_LABEL_BYTES]
+    label_ingest = ingest_label_files(bulk_paths)
+    print("📥 라벨 일괄 로드 완료\n" + label_ingest.report())
+
     # ✅ 창 열기
-    window = VideoWindow(video_label_pairs)
+    window = VideoWindow(video_label_pairs, label_ingest)
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
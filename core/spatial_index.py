@@ -0,0 +1,113 @@
+# 📁 spatial_index.py
+# 선 / 영역용 균일 격자 공간 인덱스
+# - 화면을 cell_size 픽셀 격자로 나누고, 각 칸에 걸치는 도형 번호를 CSR 형태(칸별 시작 위치 + 번호 배열)로 보관
+# - 선분은 실제로 지나가는 칸에만, 영역은 bbox 가 덮는 칸에 등록
+# - 조회: 객체 이동 선분(또는 점)의 bbox 가 덮는 칸의 후보만 반환 → 정확한 판정은 후보에만 수행
+#   (도형이 수백 개로 늘어나도 프레임당 비용은 후보 수에만 비례)
+
+import numpy as np
+
+DEFAULT_CELL_SIZE = 64
+_EPS = 1e-6  # 칸 경계 위 교차점을 양쪽 칸 모두에 포함시키기 위한 여유
+
+
+class GridIndex:
+
+    def __init__(self, items, cells, extent, cell_size=DEFAULT_CELL_SIZE):
+        # items / cells: 같은 길이의 (도형 번호, 칸 번호) 쌍, extent: (x0, y0, 열 수, 행 수)
+        self.cell_size = cell_size
+        self.x0, self.y0, self.n_cols, self.n_rows = extent
+        self.n_items = int(items.max()) + 1 if len(items) else 0
+
+        order = np.lexsort((items, cells))
+        self.cell_items = items[order]
+        # cell_start[c] ~ cell_start[c + 1] 이 칸 c 의 도형 번호 범위
+        self.cell_start = np.searchsorted(cells[order], np.arange(self.n_cols * self.n_rows + 1))
+
+    @staticmethod
+    def _extent(x_min, y_min, x_max, y_max, cell_size):
+        if len(x_min) == 0:
+            return 0, 0, 0, 0
+        x0 = int(np.floor(x_min.min() / cell_size)) * cell_size
+        y0 = int(np.floor(y_min.min() / cell_size)) * cell_size
+        n_cols = int((x_max.max() - x0) // cell_size) + 1
+        n_rows = int((y_max.max() - y0) // cell_size) + 1
+        return x0, y0, n_cols, n_rows
+
+    @classmethod
+    def from_boxes(cls, boxes, cell_size=DEFAULT_CELL_SIZE):
+        # (K, 4) x_min, y_min, x_max, y_max → bbox 가 덮는 모든 칸에 등록 (영역용)
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        extent = cls._extent(boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3], cell_size)
+        grid = cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), extent, cell_size)
+        q, cells = grid._box_cells(boxes)
+        return cls(q, cells, extent, cell_size)
+
+    @classmethod
+    def from_segments(cls, p1, p2, cell_size=DEFAULT_CELL_SIZE):
+        # (L, 2) 시작점, (L, 2) 끝점 → 선분이 실제로 지나가는 칸에만 등록 (선용)
+        p1 = np.asarray(p1, dtype=np.float64).reshape(-1, 2)
+        p2 = np.asarray(p2, dtype=np.float64).reshape(-1, 2)
+        lo, hi = np.minimum(p1, p2), np.maximum(p1, p2)
+        x0, y0, n_cols, n_rows = extent = cls._extent(lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1], cell_size)
+
+        items, cells = [], []
+        for k, ((ax, ay), (bx, by)) in enumerate(zip(p1.tolist(), p2.tolist())):
+            c0 = int((min(ax, bx) - x0) // cell_size)
+            c1 = int((max(ax, bx) - x0) // cell_size)
+            for c in range(c0, c1 + 1):
+                # 열 c 안에 들어오는 선분 구간의 y 범위 → 행 범위
+                sx0 = max(min(ax, bx), x0 + c * cell_size)
+                sx1 = min(max(ax, bx), x0 + (c + 1) * cell_size)
+                if ax == bx:
+                    ya, yb = ay, by
+                else:
+                    t = (np.array([sx0, sx1]) - ax) / (bx - ax)
+                    ya, yb = ay + t * (by - ay)
+                r0 = int((min(ya, yb) - _EPS - y0) // cell_size)
+                r1 = int((max(ya, yb) + _EPS - y0) // cell_size)
+                for r in range(max(r0, 0), min(r1, n_rows - 1) + 1):
+                    items.append(k)
+                    cells.append(r * n_cols + c)
+        return cls(np.array(items, dtype=np.int64), np.array(cells, dtype=np.int64), extent, cell_size)
+
+    def _box_cells(self, boxes):
+        # (Q, 4) 조회 bbox → 덮는 칸들의 (조회 번호, 칸 번호) 쌍 (격자 범위 밖은 제외)
+        if self.n_cols == 0 or len(boxes) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        c0 = np.floor((boxes[:, 0] - _EPS - self.x0) / self.cell_size).astype(np.int64)
+        r0 = np.floor((boxes[:, 1] - _EPS - self.y0) / self.cell_size).astype(np.int64)
+        c1 = np.floor((boxes[:, 2] + _EPS - self.x0) / self.cell_size).astype(np.int64)
+        r1 = np.floor((boxes[:, 3] + _EPS - self.y0) / self.cell_size).astype(np.int64)
+        c0, r0 = np.maximum(c0, 0), np.maximum(r0, 0)
+        c1, r1 = np.minimum(c1, self.n_cols - 1), np.minimum(r1, self.n_rows - 1)
+
+        w = np.maximum(c1 - c0 + 1, 0)
+        h = np.maximum(r1 - r0 + 1, 0)
+        n = w * h
+        q = np.repeat(np.arange(len(boxes)), n)
+        # 조회별 칸 순번 k → (행, 열)
+        k = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        wq = w[q]
+        return q, (r0[q] + k // np.maximum(wq, 1)) * self.n_cols + c0[q] + k % np.maximum(wq, 1)
+
+    def candidates(self, boxes):
+        # (Q, 4) 조회 bbox → 후보 (조회 번호, 도형 번호) 쌍, 조회 번호 → 도형 번호 순으로 정렬 / 중복 제거
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        q, cells = self._box_cells(boxes)
+        start, end = self.cell_start[cells], self.cell_start[cells + 1]
+        n = end - start
+        q = np.repeat(q, n)
+        idx = np.repeat(start, n) + np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        pair = np.unique(q * max(self.n_items, 1) + self.cell_items[idx])
+        return pair // max(self.n_items, 1), pair % max(self.n_items, 1)
+
+    def candidates_for_segments(self, a, b):
+        # (S, 2) 시작점, (S, 2) 끝점 → 이동 선분 bbox 기준 후보 쌍
+        a = np.asarray(a, dtype=np.float64).reshape(-1, 2)
+        b = np.asarray(b, dtype=np.float64).reshape(-1, 2)
+        return self.candidates(np.hstack((np.minimum(a, b), np.maximum(a, b))))
+
+    def candidates_for_points(self, points):
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return self.candidates(np.hstack((pts, pts)))
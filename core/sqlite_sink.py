@@ -0,0 +1,185 @@
+# 📁 sqlite_sink.py
+# 분석 결과 SQLite 저장 (여러 영상 / 여러 번 실행한 결과를 DB 하나에 누적, SQL 로 조회)
+# - detections: 프레임별 객체 (선 통과 / 영역 포함 여부는 '0101' 형태 문자열, i 번째 글자 = 선 / 영역 i)
+# - events: 선 통과(line_cross) / 불법 정차(illegal_stop) 이벤트, 장소 · 영상 기준 시각 포함
+# - WAL 모드: 기록 중에도 다른 프로세스에서 읽기 가능
+# - 기록은 전용 스레드에서: 행을 버퍼에 모았다가 batch_rows 개 또는 flush_interval_ms 마다 트랜잭션 하나로 삽입
+#   (SQLite 연결은 만든 스레드에서만 사용)
+#
+# 조회 예) 장소 X 의 08:00~09:00 불법 정차
+#   SELECT * FROM events WHERE event_type = 'illegal_stop' AND location = 'X'
+#     AND time BETWEEN '2024-10-21 08:00:00' AND '2024-10-21 09:00:00'
+
+import os
+import re
+import sqlite3
+import time
+import threading
+from datetime import datetime, timedelta
+
+DEFAULT_BATCH_ROWS = 5000
+DEFAULT_FLUSH_INTERVAL_MS = 1000
+
+EVENT_LINE_CROSS = 'line_cross'
+EVENT_ILLEGAL_STOP = 'illegal_stop'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS detections (
+    video TEXT NOT NULL,
+    frame INTEGER NOT NULL,
+    obj_id INTEGER NOT NULL,
+    x1 INTEGER, y1 INTEGER, x2 INTEGER, y2 INTEGER,
+    label INTEGER,
+    lines TEXT,
+    areas TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_detections_video_frame ON detections (video, frame);
+CREATE INDEX IF NOT EXISTS idx_detections_obj_id ON detections (obj_id);
+
+CREATE TABLE IF NOT EXISTS events (
+    video TEXT NOT NULL,
+    location TEXT,
+    frame INTEGER NOT NULL,
+    time TEXT,
+    obj_id INTEGER NOT NULL,
+    event_type TEXT NOT NULL,
+    line_id INTEGER,
+    label INTEGER,
+    seconds REAL
+);
+CREATE INDEX IF NOT EXISTS idx_events_video_frame ON events (video, frame);
+CREATE INDEX IF NOT EXISTS idx_events_obj_id ON events (obj_id);
+CREATE INDEX IF NOT EXISTS idx_events_type_time ON events (event_type, location, time);
+"""
+
+_INSERT = {
+    'detections': "INSERT INTO detections VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+    'events': "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+}
+
+# 영상 파일명 앞부분의 녹화 시작 시각, 예) "2024-10-21 08_56_19.337.mp4"
+_VIDEO_TIME_RE = re.compile(r'(\d{4}-\d{2}-\d{2})[ _](\d{2})_(\d{2})_(\d{2})(?:\.(\d+))?')
+
+
+def video_start_time(video_path):
+    # 파일명에서 녹화 시작 시각 추출, 형식이 다르면 None
+    m = _VIDEO_TIME_RE.match(os.path.basename(video_path))
+    if m is None:
+        return None
+    date, hh, mm, ss, frac = m.groups()
+    t = datetime.strptime(f"{date} {hh}:{mm}:{ss}", "%Y-%m-%d %H:%M:%S")
+    if frac:
+        t += timedelta(seconds=float("0." + frac))
+    return t
+
+
+def frame_time(start_time, frame, fps):
+    # 영상 시작 시각 + 프레임 → 'YYYY-MM-DD HH:MM:SS.fff' (문자열 비교 = 시간 순)
+    if start_time is None or not fps:
+        return None
+    return (start_time + timedelta(seconds=frame / fps)).isoformat(sep=' ', timespec='milliseconds')
+
+
+def _bits(states):
+    return ''.join('1' if s else '0' for s in states)
+
+
+class SqliteResultSink:
+
+    def __init__(self, path, batch_rows=DEFAULT_BATCH_ROWS, flush_interval_ms=DEFAULT_FLUSH_INTERVAL_MS):
+        self.path = path
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._buf = {table: [] for table in _INSERT}
+        self._n_buf = 0
+        self._written = 0    # 추가된 행 수
+        self._flushed = 0    # 커밋된 행 수
+        self._closed = False
+        self._flush_requested = False
+        self._error = None
+        self._cond = threading.Condition()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sqlite-sink", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def add_detection(self, video, frame, obj_id, x1, y1, x2, y2, label, line_states, area_states):
+        self._add('detections', (video, frame, obj_id, x1, y1, x2, y2, label,
+                                 _bits(line_states), _bits(area_states)))
+
+    def add_event(self, video, location, frame, time, obj_id, event_type, line_id=None, label=None, seconds=None):
+        self._add('events', (video, location, frame, time, obj_id, event_type, line_id, label, seconds))
+
+    def _add(self, table, row):
+        with self._cond:
+            if self._closed:
+                raise ValueError(f"닫힌 DB 에 기록할 수 없습니다: {self.path}")
+            self._buf[table].append(row)
+            self._n_buf += 1
+            self._written += 1
+            if self._n_buf >= self.batch_rows:
+                self._cond.notify_all()
+
+    def flush(self):
+        # 지금까지 추가된 행이 모두 커밋될 때까지 대기
+        with self._cond:
+            target = self._written
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._flushed < target and self._thread.is_alive():
+                self._cond.wait(0.1)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+        except sqlite3.Error as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+
+        try:
+            while True:
+                with self._cond:
+                    # batch_rows 행이 쌓이거나, flush_interval 이 지나거나, flush / close 요청이 올 때까지 대기
+                    deadline = time.monotonic() + self.flush_interval
+                    while not (self._closed or self._flush_requested or self._n_buf >= self.batch_rows):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    batch, n = self._buf, self._n_buf
+                    self._buf = {table: [] for table in _INSERT}
+                    self._n_buf = 0
+                    self._flush_requested = False
+                    closing = self._closed
+                if n:
+                    try:
+                        with conn:  # 트랜잭션 하나로 커밋
+                            for table, rows in batch.items():
+                                if rows:
+                                    conn.executemany(_INSERT[table], rows)
+                    except sqlite3.Error as e:
+                        print(f"[WARN] DB 기록 실패 ({self.path}): {e}")
+                with self._cond:
+                    self._flushed += n
+                    self._cond.notify_all()
+                    if closing and not self._n_buf:
+                        return
+        finally:
+            conn.close()
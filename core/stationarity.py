@@ -0,0 +1,108 @@
+# 📁 stationarity.py
+# 객체별 정지 상태 판단 (불법 주정차 실시간 감지용)
+# - 객체마다 최근 위치를 고정 크기 링 버퍼(NumPy 배열)에 보관, 합 / 제곱합을 누적해 두고
+#   새 위치가 들어올 때 가장 오래된 값만 빼서 이동 평균 / 분산을 O(1) 로 갱신
+# - 최근 window_seconds 동안의 변위(가장 오래된 위치 → 최신 위치)와 위치 표준편차가 모두 작으면 "정지"
+# - 정지가 연속으로 이어진 시간(초)을 반환 → 영역 안에 있는 동안 바로 위반 판단 가능 (영역을 떠날 때까지 기다리지 않음)
+
+import math
+import numpy as np
+
+DEFAULT_WINDOW_SECONDS = 1.0
+DEFAULT_MAX_DISPLACEMENT = 10.0  # 픽셀
+DEFAULT_MAX_STD = 4.0            # 픽셀
+
+
+class PositionRing:
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.frames = np.zeros(capacity, dtype=np.int64)
+        self.xy = np.zeros((capacity, 2), dtype=np.float64)
+        self.head = 0    # 다음에 쓸 위치
+        self.count = 0
+        self.sum_x = self.sum_y = 0.0
+        self.sq_x = self.sq_y = 0.0
+
+    def push(self, frame, x, y):
+        if self.count == self.capacity:
+            ox, oy = self.xy[self.head]
+            self.sum_x -= ox
+            self.sum_y -= oy
+            self.sq_x -= ox * ox
+            self.sq_y -= oy * oy
+        else:
+            self.count += 1
+        self.frames[self.head] = frame
+        self.xy[self.head] = (x, y)
+        self.sum_x += x
+        self.sum_y += y
+        self.sq_x += x * x
+        self.sq_y += y * y
+        self.head = (self.head + 1) % self.capacity
+
+    def _oldest(self):
+        return (self.head - self.count) % self.capacity
+
+    def _newest(self):
+        return (self.head - 1) % self.capacity
+
+    def oldest_frame(self):
+        return int(self.frames[self._oldest()])
+
+    def newest_frame(self):
+        return int(self.frames[self._newest()])
+
+    def displacement(self):
+        (ax, ay), (bx, by) = self.xy[self._oldest()], self.xy[self._newest()]
+        return math.hypot(bx - ax, by - ay)
+
+    def std(self):
+        # x / y 분산 합의 제곱근 (위치가 퍼진 정도, 픽셀)
+        n = self.count
+        var = (self.sq_x - self.sum_x * self.sum_x / n + self.sq_y - self.sum_y * self.sum_y / n) / n
+        return math.sqrt(max(var, 0.0))
+
+
+class StationarityDetector:
+
+    def __init__(self, fps, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 max_displacement=DEFAULT_MAX_DISPLACEMENT, max_std=DEFAULT_MAX_STD):
+        self.fps = fps if fps and fps > 0 else 30.0
+        self.window = max(int(round(self.fps * window_seconds)), 2)  # 링 버퍼 크기 (프레임)
+        self.max_displacement = max_displacement
+        self.max_std = max_std
+        self.rings = {}        # obj_id → PositionRing
+        self.still_since = {}  # obj_id → 정지 시작 프레임
+
+    def update(self, obj_id, frame, x, y):
+        # 위치 추가 후 연속 정지 시간(초) 반환, 움직이는 중이면 0
+        ring = self.rings.get(obj_id)
+        if ring is None:
+            ring = self.rings[obj_id] = PositionRing(self.window)
+        ring.push(frame, x, y)
+
+        still = (ring.count == ring.capacity and
+                 ring.displacement() <= self.max_displacement and
+                 ring.std() <= self.max_std)
+        if not still:
+            self.still_since.pop(obj_id, None)
+            return 0.0
+        # 버퍼가 덮는 구간의 처음부터 정지한 것으로 봄
+        since = self.still_since.setdefault(obj_id, ring.oldest_frame())
+        return (frame - since) / self.fps
+
+    def stationary_seconds(self, obj_id, frame):
+        since = self.still_since.get(obj_id)
+        return 0.0 if since is None else (frame - since) / self.fps
+
+    def discard_object(self, obj_id):
+        self.rings.pop(obj_id, None)
+        self.still_since.pop(obj_id, None)
+
+    def clear(self):
+        self.rings.clear()
+        self.still_since.clear()
+
+    def __contains__(self, obj_id):
+        return obj_id in self.rings
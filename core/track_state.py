@@ -0,0 +1,98 @@
+# 📁 track_state.py
+# 객체별 상태 수명 관리
+# - ObjectPairSet: (obj_id, line_id) 쌍 집합 + obj_id 별 인덱스
+#   기존 set 과 같은 방식(add / in / 반복)으로 사용, "이 객체가 선을 하나라도 통과했나" 를 O(1) 로 조회
+# - TrackStateManager: 객체별 마지막 관측 프레임 기록, ttl_frames 동안 안 보인 객체 목록 반환
+#   (오래된 객체의 prev_positions / stop_watch / crossed_lines 등을 정리해 장시간 재생 시 메모리 증가 방지)
+
+from collections import OrderedDict
+
+DEFAULT_TTL_FRAMES = 1800  # 30fps 기준 1분
+
+
+class ObjectPairSet:
+
+    def __init__(self, pairs=()):
+        self._by_obj = {}  # obj_id → {line_id, ...}
+        self._n = 0
+        for pair in pairs:
+            self.add(pair)
+
+    def add(self, pair):
+        obj_id, key = pair
+        keys = self._by_obj.setdefault(obj_id, set())
+        if key not in keys:
+            keys.add(key)
+            self._n += 1
+
+    def __contains__(self, pair):
+        obj_id, key = pair
+        keys = self._by_obj.get(obj_id)
+        return keys is not None and key in keys
+
+    def has_object(self, obj_id):
+        return obj_id in self._by_obj
+
+    def keys_of(self, obj_id):
+        return self._by_obj.get(obj_id, set())
+
+    def discard_object(self, obj_id):
+        keys = self._by_obj.pop(obj_id, None)
+        if keys:
+            self._n -= len(keys)
+
+    def clear(self):
+        self._by_obj.clear()
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        for obj_id, keys in self._by_obj.items():
+            for key in keys:
+                yield obj_id, key
+
+
+def forget_object(container, obj_id):
+    # 객체별 상태 컨테이너에서 obj_id 제거 (dict / set / discard_object 지원 객체)
+    if hasattr(container, 'discard_object'):
+        container.discard_object(obj_id)
+    elif isinstance(container, dict):
+        container.pop(obj_id, None)
+    else:
+        container.discard(obj_id)
+
+
+class TrackStateManager:
+
+    def __init__(self, ttl_frames=DEFAULT_TTL_FRAMES):
+        self.ttl_frames = ttl_frames
+        self.last_seen = OrderedDict()  # obj_id → 마지막 관측 프레임 (관측 순서대로 유지)
+
+    def touch(self, frame, obj_ids):
+        for obj_id in obj_ids:
+            self.last_seen[obj_id] = frame
+            self.last_seen.move_to_end(obj_id)
+
+    def evict(self, frame):
+        # frame 기준 ttl_frames 보다 오래 안 보인 객체를 제거하고 목록 반환
+        # 관측 순서 맨 앞부터 확인하므로 제거 대상이 없으면 O(1)
+        # (뒤로 탐색한 경우 순서가 프레임 순과 다를 수 있으나, 남는 쪽으로만 어긋나므로 안전)
+        expired = []
+        while self.last_seen:
+            obj_id, seen = next(iter(self.last_seen.items()))
+            if frame - seen <= self.ttl_frames:
+                break
+            self.last_seen.popitem(last=False)
+            expired.append(obj_id)
+        return expired
+
+    def clear(self):
+        self.last_seen.clear()
+
+    def __len__(self):
+        return len(self.last_seen)
+
+    def __contains__(self, obj_id):
+        return obj_id in self.last_seen
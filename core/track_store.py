@@ -0,0 +1,186 @@
+# 📁 track_store.py
+# 라벨 파일(frame,id,x1,y1,x2,y2,label)을 NumPy 구조체 배열로 보관하는 트랙 저장소
+# - 프레임 순으로 정렬된 하나의 배열 + 객체가 있는 프레임 번호 / 프레임별 시작 행 (searchsorted 로 조회)
+#   인덱스 크기는 프레임 번호 범위가 아니라 실제 프레임 수에 비례 (음수 / 아주 큰 프레임 번호도 그대로 보관)
+# - 프레임별 객체는 복사 없이 배열 슬라이스로 반환
+# - 기존 dict(frame → [(obj_id, x1, y1, x2, y2, label), ...]) 와 같은 방식으로 사용 가능
+# - 보조 인덱스 TrajectoryIndex: obj_id → 연속 배열(프레임, 중심 좌표, 박스 크기)
+
+import numpy as np
+from collections import namedtuple
+from label_parser import parse_label_file
+
+TRACK_DTYPE = np.dtype([
+    ('frame', np.int32),
+    ('obj_id', np.int32),
+    ('x1', np.int32),
+    ('y1', np.int32),
+    ('x2', np.int32),
+    ('y2', np.int32),
+    ('label', np.int32),
+])
+
+# 프레임 번호를 제외한 객체 정보 필드 (기존 튜플 순서와 동일)
+OBJECT_FIELDS = ['obj_id', 'x1', 'y1', 'x2', 'y2', 'label']
+
+
+def records_from_array(values):
+    # (N, 7) 정수 배열 → TRACK_DTYPE 구조체 배열
+    values = np.asarray(values).reshape(-1, len(TRACK_DTYPE.names))
+    records = np.empty(len(values), dtype=TRACK_DTYPE)
+    for i, name in enumerate(TRACK_DTYPE.names):
+        records[name] = values[:, i]
+    return records
+
+
+# 한 객체의 궤적 (각 필드는 프레임 순으로 정렬된 배열, TrajectoryIndex 배열의 슬라이스)
+Trajectory = namedtuple('Trajectory', ['obj_id', 'frame', 'cx', 'cy', 'w', 'h', 'label'])
+
+
+class TrajectoryIndex:
+
+    def __init__(self, records):
+        # (obj_id, frame) 순으로 정렬해 객체별 행을 연속 구간으로 모음
+        order = np.lexsort((records['frame'], records['obj_id']))
+        rows = records[order]
+        self.row_order = order  # 궤적 순서 i → 원본 records 행 번호
+
+        x1, y1 = rows['x1'], rows['y1']
+        x2, y2 = rows['x2'], rows['y2']
+        self.frame = rows['frame']
+        # 중심 좌표는 GUI 와 동일하게 int((x1 + x2) / 2) (0 방향 버림)
+        self.cx = ((x1 + x2) / 2).astype(np.int32)
+        self.cy = ((y1 + y2) / 2).astype(np.int32)
+        self.w = x2 - x1
+        self.h = y2 - y1
+        self.label = rows['label']
+        self.obj_id = rows['obj_id']
+
+        self.obj_ids, self.starts, counts = np.unique(self.obj_id, return_index=True, return_counts=True)
+        self.ends = self.starts + counts
+        self.first_frame = self.frame[self.starts]  # 객체별 첫 등장 프레임
+        self.last_frame = self.frame[self.ends - 1]  # 객체별 마지막 등장 프레임
+
+    def _position(self, obj_id):
+        i = int(np.searchsorted(self.obj_ids, obj_id))
+        if i < len(self.obj_ids) and self.obj_ids[i] == obj_id:
+            return i
+        return -1
+
+    def __contains__(self, obj_id):
+        return self._position(obj_id) >= 0
+
+    def __len__(self):
+        return len(self.obj_ids)
+
+    def __iter__(self):
+        return iter(self.obj_ids.tolist())
+
+    def track(self, obj_id):
+        i = self._position(obj_id)
+        if i < 0:
+            raise KeyError(obj_id)
+        s, e = self.starts[i], self.ends[i]
+        return Trajectory(obj_id, self.frame[s:e], self.cx[s:e], self.cy[s:e],
+                          self.w[s:e], self.h[s:e], self.label[s:e])
+
+    def frame_span(self, obj_id):
+        i = self._position(obj_id)
+        if i < 0:
+            raise KeyError(obj_id)
+        return int(self.first_frame[i]), int(self.last_frame[i])
+
+    def track_ids(self):
+        # 궤적 순서 배열의 각 행이 몇 번째 객체인지 (0 ~ len-1)
+        return np.repeat(np.arange(len(self.obj_ids)), self.ends - self.starts)
+
+    def same_track_as_prev(self):
+        # 각 행이 바로 앞 행과 같은 객체인지 (연속 위치 쌍 계산용)
+        same = np.zeros(len(self.frame), dtype=bool)
+        same[1:] = self.obj_id[1:] == self.obj_id[:-1]
+        return same
+
+
+class TrackStore:
+
+    def __init__(self, records):
+        records = np.asarray(records, dtype=TRACK_DTYPE)
+        frames = records['frame']
+
+        # 프레임 순 정렬 (파일 내 같은 프레임의 객체 순서는 유지)
+        if len(frames) > 1 and np.any(frames[1:] < frames[:-1]):
+            records = records[np.argsort(frames, kind='stable')]
+            frames = records['frame']
+
+        self.records = records
+        # 객체가 존재하는 프레임 번호들 (정렬되어 있으므로 값이 바뀌는 위치만 추림)
+        if len(frames):
+            change = np.flatnonzero(np.concatenate(([True], frames[1:] != frames[:-1])))
+        else:
+            change = np.zeros(0, dtype=np.int64)
+        self.frames = frames[change]
+        # frame_starts[k] ~ frame_starts[k + 1] 이 프레임 frames[k] 의 행 범위
+        self.frame_starts = np.append(change, len(frames)).astype(np.int64)
+
+        self._trajectories = None
+
+    @classmethod
+    def from_array(cls, values):
+        return cls(records_from_array(values))
+
+    def frame_rows(self, frame):
+        # 해당 프레임의 행들 (복사 없는 슬라이스, 없으면 빈 배열)
+        start, end = self.row_range(frame)
+        return self.records[start:end]
+
+    def row_range(self, frame):
+        k = int(np.searchsorted(self.frames, frame))
+        if k < len(self.frames) and self.frames[k] == frame:
+            return int(self.frame_starts[k]), int(self.frame_starts[k + 1])
+        return 0, 0
+
+    # ── dict 호환 인터페이스 ──────────────────────────
+    def __contains__(self, frame):
+        start, end = self.row_range(frame)
+        return end > start
+
+    def __getitem__(self, frame):
+        rows = self.frame_rows(frame)
+        if len(rows) == 0:
+            raise KeyError(frame)
+        return rows[OBJECT_FIELDS].tolist()
+
+    def get(self, frame, default=None):
+        rows = self.frame_rows(frame)
+        if len(rows) == 0:
+            return default
+        return rows[OBJECT_FIELDS].tolist()
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        return iter(self.frames.tolist())
+
+    def keys(self):
+        return self.frames.tolist()
+
+    def items(self):
+        for frame in self.frames.tolist():
+            yield frame, self[frame]
+
+    @property
+    def num_rows(self):
+        return len(self.records)
+
+    @property
+    def trajectories(self):
+        # 객체별 궤적 인덱스 (처음 접근 시 한 번만 생성)
+        if self._trajectories is None:
+            self._trajectories = TrajectoryIndex(self.records)
+        return self._trajectories
+
+
+def load_track_store(path, strict=False):
+    # 라벨 텍스트 → TrackStore (바이트 단위 벡터 파서 사용, label_parser.py 참고)
+    return TrackStore.from_array(parse_label_file(path, strict=strict))
@@ -3,5 +3,24 @@ import cv2
 import numpy as np
 
 def point_in_polygon(pt, polygon):
-    pts = np.array([[p.x(), p.y()] for p in polygon], dtype=np.int32).reshape((-1, 1, 2))
-    return cv2.pointPolygonTest(pts, pt, False) >= 0
+    # 경계 위 점도 포함 (기존 cv2.pointPolygonTest(...) >= 0 과 같은 결과)
+    # 한 점용: 배열을 만들지 않고 변마다 교차 수 판정 (여러 점은 zones.Zone.contains)
+    px, py = pt
+    n = len(polygon)
+    inside = False
+    for i in range(n):
+        xi, yi = point_xy(polygon[i])
+        xj, yj = point_xy(polygon[(i + 1) % n])
+        dy = yj - yi
+        cross = (px - xi) * dy - (py - yi) * (xj - xi)
+        if cross == 0 and min(xi, xj) <= px <= max(xi, xj) and min(yi, yj) <= py <= max(yi, yj):
+            return True  # 변 위의 점
+        if (yi > py) != (yj > py) and (cross < 0 if dy > 0 else cross > 0):
+            inside = not inside
+    return inside
+
+def point_xy(p):
+    # QPoint → (x, y), 튜플/배열은 그대로
+    if callable(getattr(p, 'x', None)):
+        return p.x(), p.y()
+    return p[0], p[1]
@@ -0,0 +1,133 @@
+# 📁 zones.py
+# 정지 감지 영역(stop_polygons) 포함 판정
+# - ZoneIndex: 영역 bbox 를 격자 인덱스(spatial_index.GridIndex)에 등록해 두고
+#   각 점마다 그 점의 칸에 걸친 후보 영역만 정확히 판정 (영역별 Zone.contains 한 번)
+# - ZoneMask: 영역을 프레임 크기 비트마스크로 미리 그려 두고 (픽셀당 영역 k 포함 → k 번째 비트)
+#   객체 중심 픽셀 값을 한 번에 모아 비트를 풀어 판정 (영역이 추가/수정/삭제될 때만 다시 그림)
+#   경계 부근 픽셀 / 화면 밖 점은 래스터화 오차가 있을 수 있으므로 ZoneIndex 로 정확히 판정
+# - Zone: 다각형 하나 (꼭짓점 배열 + bbox, 여러 점 포함 판정을 벡터 연산으로)
+# - ZoneIndex / ZoneMask 모두 프레임의 모든 객체 중심에 대해 한 번에 (객체 수, 영역 수) 포함 여부 배열 반환
+
+import numpy as np
+import cv2
+from spatial_index import GridIndex, DEFAULT_CELL_SIZE
+from utils import point_xy
+
+
+class Zone:
+    # 다각형 영역 (꼭짓점 수 제한 없음)
+    # - 꼭짓점은 NumPy 배열로 한 번만 변환해 두고 bbox 도 미리 계산
+    # - contains(points): N 개 점을 bbox 로 먼저 거른 뒤 교차 수(crossing number) 판정을 벡터 연산으로 수행
+    # - 경계 위 점은 안쪽으로 처리, 자기 교차 다각형은 홀짝 규칙 (cv2.pointPolygonTest 와 동일)
+
+    def __init__(self, points, description=""):
+        self.vertices = np.array([point_xy(p) for p in points], dtype=np.float64).reshape(-1, 2)
+        self.description = description
+        if len(self.vertices):
+            self.bbox = (*self.vertices.min(axis=0), *self.vertices.max(axis=0))
+        else:
+            self.bbox = (np.inf, np.inf, -np.inf, -np.inf)
+        # 변 i: vertices[i] → vertices[i + 1] (마지막 → 처음)
+        self._start = self.vertices
+        self._end = np.roll(self.vertices, -1, axis=0)
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def contains(self, points):
+        # (N, 2) 점 → (N,) 포함 여부
+        pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        inside = np.zeros(len(pts), dtype=bool)
+        if len(self.vertices) == 0:
+            return inside
+        x_min, y_min, x_max, y_max = self.bbox
+        cand = np.flatnonzero((pts[:, 0] >= x_min) & (pts[:, 0] <= x_max) &
+                              (pts[:, 1] >= y_min) & (pts[:, 1] <= y_max))
+        if len(cand) == 0:
+            return inside
+
+        px, py = pts[cand, 0:1], pts[cand, 1:2]          # (M, 1)
+        xi, yi = self._start[:, 0], self._start[:, 1]    # (E,)
+        xj, yj = self._end[:, 0], self._end[:, 1]
+
+        # 점에서 오른쪽으로 그은 반직선이 변과 만나는 횟수 (나눗셈 없이 부호로 비교)
+        dy = yj - yi
+        cross = (px - xi) * dy - (py - yi) * (xj - xi)
+        straddle = (yi > py) != (yj > py)
+        hits = straddle & np.where(dy > 0, cross < 0, cross > 0)
+        odd = (np.count_nonzero(hits, axis=1) % 2) == 1
+
+        # 변 위의 점 (일직선 + 변의 bbox 안)
+        on_edge = ((cross == 0) &
+                   (px >= np.minimum(xi, xj)) & (px <= np.maximum(xi, xj)) &
+                   (py >= np.minimum(yi, yj)) & (py <= np.maximum(yi, yj))).any(axis=1)
+
+        inside[cand] = odd | on_edge
+        return inside
+
+    def contains_point(self, x, y):
+        return bool(self.contains([(x, y)])[0])
+
+
+class ZoneIndex:
+
+    def __init__(self, polygons, cell_size=DEFAULT_CELL_SIZE):
+        # polygons: 영역별 꼭짓점 목록 [[QPoint 또는 (x, y), ...], ...] (꼭짓점 3개 미만은 항상 바깥)
+        self.polygons = [list(p) for p in polygons]
+        self.zones = [Zone(p) for p in self.polygons]
+        self.zone_ids = np.array([k for k, z in enumerate(self.zones) if len(z) >= 3], dtype=np.int64)
+        boxes = [self.zones[k].bbox for k in self.zone_ids.tolist()]
+        self.grid = GridIndex.from_boxes(np.array(boxes).reshape(-1, 4), cell_size)
+
+    def __len__(self):
+        return len(self.polygons)
+
+    def membership(self, points):
+        # (N, 2) 점 → (N, 영역 수) 포함 여부 (경계 위도 포함)
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        inside = np.zeros((len(pts), len(self.polygons)), dtype=bool)
+        q, k = self.grid.candidates_for_points(pts)
+        zone_of = self.zone_ids[k]
+        for zi in np.unique(zone_of).tolist():
+            rows = q[zone_of == zi]
+            inside[rows, zi] = self.zones[zi].contains(pts[rows])
+        return inside
+
+
+class ZoneMask:
+
+    MAX_ZONES = 64
+
+    def __init__(self, polygons, width, height, cell_size=DEFAULT_CELL_SIZE):
+        self.index = ZoneIndex(polygons, cell_size)  # 경계 / 화면 밖 점의 정확한 판정용
+        self.width, self.height = width, height
+        n = len(self.index)
+        if n > self.MAX_ZONES:
+            raise ValueError(f"영역 비트마스크는 최대 {self.MAX_ZONES}개까지 지원합니다 (현재 {n}개)")
+        self.dtype = np.uint32 if n <= 32 else np.uint64
+
+        self.mask = np.zeros((height, width), dtype=self.dtype)
+        self.edge = np.zeros((height, width), dtype=np.uint8)  # 경계 ±1 픽셀: 정확한 판정 필요
+        layer = np.empty((height, width), dtype=np.uint8)
+        for k in self.index.zone_ids.tolist():
+            pts = np.array([point_xy(p) for p in self.index.polygons[k]], dtype=np.int32).reshape(-1, 1, 2)
+            layer.fill(0)
+            cv2.fillPoly(layer, [pts], 1)
+            self.mask[layer.view(bool)] |= self.dtype(1 << k)
+            cv2.polylines(self.edge, [pts], True, 1, thickness=3)
+        self.bits = (np.arange(n, dtype=np.uint64)).astype(self.dtype)
+
+    def __len__(self):
+        return len(self.index)
+
+    def membership(self, points):
+        pts = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+        x, y = pts[:, 0], pts[:, 1]
+        on_screen = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        xs, ys = np.where(on_screen, x, 0), np.where(on_screen, y, 0)
+
+        inside = ((self.mask[ys, xs][:, None] >> self.bits) & 1).astype(bool)
+        exact = ~on_screen | (self.edge[ys, xs] > 0)
+        if exact.any():
+            inside[exact] = self.index.membership(pts[exact])
+        return inside